@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Times the nightly pipeline on generated data, offline. e.g.
+#   python run_benchmarks.py --scales day week season
+#   python run_benchmarks.py --compare results/before.json results/after.json
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import statistics
+from datetime import datetime
+
+here = os.path.dirname(os.path.abspath(__file__))
+daily_folder = os.path.join(here, '..', 'daily')
+sys.path[:0] = [daily_folder, os.path.join(here, '..', 'yearly')]
+
+import numpy as np
+import pandas as pd
+import daily_functions
+import yearly_functions
+import yearly_leaderboards
+import playoff_graphics
+from synthetic_statcast import SCALES, TEAMS, generate_scale, player_register
+
+
+RESULTS_FOLDER = os.path.join(here, 'results')
+
+socials = {team: {'at': f"@{team}", 'hashtag': f"#{team}"} for team in TEAMS}
+
+
+def time_call(function, repeat):
+    """This function runs function repeat times and returns (median, fastest) seconds."""
+
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times), min(times)
+
+
+
+def record(results, benchmark, scale, rows, function, repeat):
+    median, fastest = time_call(function, repeat)
+    results.append({'benchmark': benchmark, 'scale': scale, 'rows': rows,
+                    'median_s': median, 'min_s': fastest, 'repeat': repeat})
+    print(f"{scale:>12}  {benchmark:<45} {median * 1000:10.1f} ms")
+
+
+
+def bench_cleaning(results, scale, raw, register, repeat, workdir):
+    record(results, 'clean.daily_clean_data', scale, len(raw),
+           lambda: daily_functions.clean_data(raw.copy(), register), repeat)
+
+    # the yearly loader reads data/{season}.csv and data/pitcher_data/{season}_pitcher.csv
+    if scale == 'multi_season':
+        return
+    os.makedirs(os.path.join(workdir, 'data', 'pitcher_data'), exist_ok=True)
+    pitcher_names = raw['pitcher'].map(dict(zip(register.key_mlbam, register.name_last + ', ' + register.name_first)))
+    raw.to_csv(os.path.join(workdir, 'data', 'bench.csv'), index=False)
+    raw.assign(player_name=pitcher_names).to_csv(os.path.join(workdir, 'data', 'pitcher_data', 'bench_pitcher.csv'), index=False)
+
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        record(results, 'clean.yearly_load_data', scale, len(raw),
+               lambda: yearly_functions.load_data(os.path.join('data', 'bench.csv')), repeat)
+    finally:
+        os.chdir(cwd)
+
+
+
+def bench_daily(results, scale, df, repeat):
+    for category in daily_functions.DAILY_CATEGORIES:
+        record(results, f"daily.{category['name']}", scale, len(df),
+               lambda: category['function'](df, **category['kwargs']), repeat)
+
+    record(results, 'daily.pitches_seen', scale, len(df), lambda: daily_functions.pitches_seen(df), repeat)
+    record(results, 'daily.win_prob_v2', scale, len(df), lambda: daily_functions.win_prob_v2(df, extra=True), repeat)
+    record(results, 'daily.leaderboards', scale, len(df), lambda: daily_functions.leaderboards(df), repeat)
+
+    leaders, timings = daily_functions.leaderboards(df)
+    record(results, 'tweets.create_tweets', scale, len(df),
+           lambda: daily_functions.create_tweets(leaders, socials, 'bench'), repeat)
+
+
+
+def bench_yearly(results, scale, df, repeat):
+    for name, spec in yearly_leaderboards.CATEGORIES.items():
+        record(results, f"yearly.{name}", scale, len(df), lambda: spec['function'](df, **spec['kwargs']), repeat)
+
+    record(results, 'yearly.wild_homer', scale, len(df), lambda: yearly_functions.wild_homer(df), repeat)
+    record(results, 'yearly.wild_swings', scale, len(df), lambda: yearly_functions.wild_swings(df), repeat)
+
+
+
+def card_assets(workdir):
+    """This function makes the card templates and fonts reachable from workdir under the paths the renderer uses.
+
+    The renderer names its assets with Windows separators (graphics\\fonts\\...), so elsewhere they are
+    linked under those literal names.
+    """
+
+    graphics = os.path.join(daily_folder, 'graphics')
+    if os.sep == '\\':
+        return daily_folder
+
+    for folder, subfolders, files in os.walk(graphics):
+        for file in files:
+            path = os.path.join(folder, file)
+            name = '\\'.join(os.path.relpath(path, daily_folder).split(os.sep))
+            link = os.path.join(workdir, name)
+            if not os.path.exists(link):
+                os.symlink(os.path.abspath(path), link)
+
+    return workdir
+
+
+
+def card_jobs(df):
+    jobs = []
+    for game_pk, game in df.groupby('game_pk', sort=False):
+        home_team, away_team = game.home_team.iloc[0], game.away_team.iloc[0]
+        home_final, away_final = game.post_home_score.max(), game.post_away_score.max()
+        winner = home_team if home_final > away_final else away_team
+        jobs.append({'game_wp': daily_functions.win_prob_v2(game, extra=True), 'away_team': away_team,
+                     'home_team': home_team, 'winner': playoff_graphics.team_names_dict[winner],
+                     'home_final': home_final, 'away_final': away_final, 'series': 'ALDS', 'game_num': 'GAME1'})
+    return jobs
+
+
+
+def bench_cards(results, df, repeat, workdir):
+    jobs = card_jobs(df)
+
+    cwd = os.getcwd()
+    os.chdir(card_assets(workdir))
+    try:
+        record(results, 'cards.create_graphic', 'day', 1, lambda: playoff_graphics.create_graphic(**jobs[0]), repeat)
+        for image_format in playoff_graphics.image_formats:
+            record(results, f"cards.render_job.{image_format}", 'day', 1,
+                   lambda: playoff_graphics.render_job(jobs[0], image_format), repeat)
+        for workers in sorted({1, os.cpu_count()}):
+            record(results, f"cards.render_graphics.workers_{workers}", 'day', len(jobs),
+                   lambda: playoff_graphics.render_graphics(jobs, playoff_graphics.memory_sink({}), workers), repeat)
+    finally:
+        os.chdir(cwd)
+
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=here, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+
+def run(scales, repeat=3, seed=0, output=None, cards=True):
+    """This function runs every benchmark at each scale and writes the results as JSON.
+
+    Returns the path written.
+    """
+
+    results = []
+    workdir = tempfile.mkdtemp()
+    try:
+        for scale in scales:
+            raw = generate_scale(scale, seed=seed, raw=True)
+            register = player_register(seed)
+            bench_cleaning(results, scale, raw, register, repeat, workdir)
+
+            df = daily_functions.clean_data(raw.copy(), register)
+            bench_daily(results, scale, df, repeat)
+            bench_yearly(results, scale, yearly_functions.apply_schema(df), repeat)
+
+            if cards and scale == 'day':
+                bench_cards(results, df, repeat, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    meta = {'created': datetime.now().isoformat(timespec='seconds'), 'commit': git_commit(), 'seed': seed,
+            'repeat': repeat, 'scales': {scale: SCALES[scale] for scale in scales}, 'python': platform.python_version(),
+            'pandas': pd.__version__, 'numpy': np.__version__, 'machine': platform.machine(), 'cpus': os.cpu_count()}
+
+    if output is None:
+        os.makedirs(RESULTS_FOLDER, exist_ok=True)
+        output = os.path.join(RESULTS_FOLDER, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, 'w') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=1)
+
+    print(f"wrote {output}")
+    return output
+
+
+
+def compare(before_file, after_file):
+    """This function prints how each benchmark's median time changed between two result files."""
+
+    with open(before_file) as f:
+        before = {(r['benchmark'], r['scale']): r for r in json.load(f)['results']}
+    with open(after_file) as f:
+        after = {(r['benchmark'], r['scale']): r for r in json.load(f)['results']}
+
+    for key in sorted(before.keys() & after.keys(), key=lambda key: (key[1], key[0])):
+        old, new = before[key]['median_s'], after[key]['median_s']
+        print(f"{key[1]:>12}  {key[0]:<45} {old * 1000:10.1f} ms -> {new * 1000:10.1f} ms  ({old / new:5.2f}x)")
+
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the leaderboards, cleaning, tweets and cards on generated data.')
+    parser.add_argument('--scales', nargs='+', default=['day', 'week', 'season'], choices=list(SCALES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='results file (default: results/<timestamp>.json)')
+    parser.add_argument('--no-cards', action='store_true', help='skip card rendering')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help='compare two results files and exit')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        run(args.scales, args.repeat, args.seed, args.output, not args.no_cards)
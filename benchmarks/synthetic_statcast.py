@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+
+
+# how many days each benchmark scale covers (a regular season is about 183 days)
+SCALES = {'day': 1, 'week': 7, 'season': 183, 'multi_season': 3 * 183}
+
+TEAMS = ['BAL', 'BOS', 'NYY', 'TB', 'TOR', 'CWS', 'CLE', 'DET', 'KC', 'MIN', 'HOU', 'LAA', 'OAK', 'SEA', 'TEX',
+         'ATL', 'MIA', 'NYM', 'PHI', 'WSH', 'CHC', 'CIN', 'MIL', 'PIT', 'STL', 'ARI', 'COL', 'LAD', 'SD', 'SF']
+ROSTER = 26
+
+# (pitch type, share, mean speed, mean spin)
+PITCHES = [('FF', .34, 94.0, 2300), ('SI', .16, 93.0, 2150), ('SL', .18, 85.5, 2450),
+           ('CH', .11, 85.0, 1750), ('CU', .09, 79.0, 2550), ('FC', .08, 89.0, 2350), ('KC', .04, 82.0, 2400)]
+
+# (event, share of plate appearances, ends with the ball in play)
+EVENTS = [('field_out', .42, True), ('strikeout', .22, False), ('single', .14, True), ('walk', .08, False),
+          ('double', .045, True), ('home_run', .03, True), ('grounded_into_double_play', .02, True),
+          ('force_out', .015, True), ('hit_by_pitch', .01, False), ('sac_fly', .007, True),
+          ('fielders_choice', .005, True), ('triple', .004, True), ('strikeout_double_play', .004, False)]
+
+NON_FINAL_PITCHES = ['ball', 'called_strike', 'foul', 'swinging_strike', 'blocked_ball', 'foul_tip',
+                     'swinging_strike_blocked']
+
+
+def player_register(seed=0):
+    """This function returns a player register (the columns load_player_data keeps) covering every rostered player."""
+
+    rng = np.random.default_rng(seed)
+    first = ['Aaron', 'Bryce', 'Carlos', 'Dylan', 'Eli', 'Freddie', 'Gerrit', 'Hunter', 'Ian', 'Jose',
+             'Kyle', 'Luis', 'Max', 'Nolan', 'Owen', 'Paul', 'Randy', 'Shohei', 'Trea', 'Yordan']
+    last = ['Alvarez', 'Betts', 'Correa', 'Devers', 'Escobar', 'Freeman', 'Guerrero', 'Harper', 'Judge', 'Kim',
+            'Lindor', 'Machado', 'Nola', 'Olson', 'Perez', 'Ramirez', 'Soto', 'Turner', 'Urias', 'Walker']
+    ids = np.concatenate([batter_ids(), pitcher_ids()])
+
+    return pd.DataFrame({
+        'key_mlbam': ids.astype('int32'),
+        'name_first': rng.choice(first, len(ids)),
+        'name_last': [f"{name}{i % 97}" for i, name in enumerate(rng.choice(last, len(ids)))],
+        'mlb_played_last': np.full(len(ids), 2022, dtype='int16'),
+    })
+
+
+
+def batter_ids():
+    return 600000 + np.arange(len(TEAMS) * ROSTER)
+
+
+
+def pitcher_ids():
+    return 700000 + np.arange(len(TEAMS) * ROSTER)
+
+
+
+def generate_pitches(days=1, seed=0, start='2022-04-07', games_per_day=15, raw=False):
+    """This function generates days of realistic-looking Statcast pitches.
+
+    Games have nine-inning halves of 3-6 plate appearances, each of 1-12 pitches, with the event,
+    batted-ball, win probability and score columns filled in the way Statcast fills them.
+    The same seed always gives the same frame.
+    raw returns the frame the way statcast() does (IDs, "Last, First" player_name, no teams or names),
+    for clean_data; otherwise it comes back cleaned, with batter/pitcher names and teams.
+    """
+
+    rng = np.random.default_rng(seed)
+    register = player_register(seed)
+    full_names = dict(zip(register.key_mlbam, register.name_first + ' ' + register.name_last))
+    comma_names = dict(zip(register.key_mlbam, register.name_last + ', ' + register.name_first))
+
+    # games: each day pairs the teams off
+    game_day = np.repeat(np.arange(days), games_per_day)
+    matchups = np.array([rng.permutation(len(TEAMS))[:2 * games_per_day] for day in range(days)]).reshape(-1, 2)
+    n_games = len(game_day)
+
+    # half innings: 9 innings, top and bottom
+    half_game = np.repeat(np.arange(n_games), 18)
+    half_inning = np.tile(np.repeat(np.arange(1, 10), 2), n_games)
+    half_top = np.tile([True, False], n_games * 9)
+
+    # plate appearances: 3-6 per half inning
+    pa_per_half = 3 + np.minimum(rng.poisson(1.2, len(half_game)), 3)
+    pa_half = np.repeat(np.arange(len(half_game)), pa_per_half)
+    pa_in_half = np.arange(len(pa_half)) - np.repeat(np.cumsum(pa_per_half) - pa_per_half, pa_per_half)
+    pa_outs = np.minimum(pa_in_half * 3 // np.repeat(pa_per_half, pa_per_half), 2)
+    pa_game = half_game[pa_half]
+    pa_top = half_top[pa_half]
+
+    # at_bat_number counts plate appearances through the game
+    pa_number = pd.Series(np.ones(len(pa_game), dtype=int)).groupby(pa_game).cumsum().to_numpy()
+
+    shares = np.array([share for event, share, in_play in EVENTS])
+    pa_event = rng.choice(len(EVENTS), len(pa_game), p=shares / shares.sum())
+
+    # batters come from the batting team, pitchers from the fielding team
+    home_index, away_index = matchups[pa_game, 0], matchups[pa_game, 1]
+    batting, fielding = np.where(pa_top, away_index, home_index), np.where(pa_top, home_index, away_index)
+    pa_batter = batter_ids()[batting * ROSTER + rng.integers(0, 9, len(pa_game))]
+    pa_pitcher = pitcher_ids()[fielding * ROSTER + rng.integers(0, 13, len(pa_game))]
+
+    # runs: home runs score, and the score carries through the game
+    pa_runs = np.where(np.array([event for event, share, in_play in EVENTS])[pa_event] == 'home_run',
+                       1 + rng.binomial(3, .25, len(pa_game)), 0)
+    home_runs = np.where(~pa_top, pa_runs, 0)
+    away_runs = np.where(pa_top, pa_runs, 0)
+    home_after = pd.Series(home_runs).groupby(pa_game).cumsum().to_numpy()
+    away_after = pd.Series(away_runs).groupby(pa_game).cumsum().to_numpy()
+
+    # pitches: 1-12 per plate appearance, the event on the last one
+    pitches_per_pa = 1 + np.minimum(rng.poisson(2.9, len(pa_game)), 11)
+    pa = np.repeat(np.arange(len(pa_game)), pitches_per_pa)
+    n = len(pa)
+    pitch_number = np.arange(n) - np.repeat(np.cumsum(pitches_per_pa) - pitches_per_pa, pitches_per_pa) + 1
+    last = pitch_number == pitches_per_pa[pa]
+
+    event_names = np.array([event for event, share, in_play in EVENTS], dtype=object)
+    in_play_events = np.array([in_play for event, share, in_play in EVENTS])
+    event = np.where(last, event_names[pa_event[pa]], None)
+    in_play = last & in_play_events[pa_event[pa]]
+
+    description = rng.choice(NON_FINAL_PITCHES, n, p=[.36, .17, .18, .11, .09, .05, .04]).astype(object)
+    description[in_play] = 'hit_into_play'
+    description[last & (event == 'walk')] = 'ball'
+    description[last & (event == 'hit_by_pitch')] = 'hit_by_pitch'
+    strikeouts = last & np.isin(event, ['strikeout', 'strikeout_double_play'])
+    description[strikeouts] = rng.choice(['swinging_strike', 'called_strike'], strikeouts.sum())
+
+    types = rng.choice(len(PITCHES), n, p=[share for name, share, speed, spin in PITCHES])
+    pitch_type = np.array([name for name, share, speed, spin in PITCHES], dtype=object)[types]
+    speed = np.round(np.array([speed for name, share, speed, spin in PITCHES])[types] + rng.normal(0, 2.2, n), 1)
+    spin = np.round(np.array([spin for name, share, speed, spin in PITCHES])[types] + rng.normal(0, 180, n))
+
+    homer = event == 'home_run'
+    launch_speed = np.where(in_play, np.round(rng.normal(89, 14, n).clip(30, 121), 1), np.nan)
+    launch_speed[homer] = np.round(rng.normal(104, 4, homer.sum()).clip(92, 120), 1)
+    launch_angle = np.where(in_play, np.round(rng.normal(12, 25, n).clip(-80, 85)), np.nan)
+    launch_angle[homer] = np.round(rng.normal(28, 5, homer.sum()).clip(15, 48))
+    hit_distance = np.where(in_play, np.round(rng.normal(160, 110, n).clip(1, 480)), np.nan)
+    hit_distance[homer] = np.round(rng.normal(400, 25, homer.sum()).clip(320, 495))
+
+    des = np.where(homer, 'homers on a fly ball to center field.', '').astype(object)
+    inside = homer & (rng.random(n) < .01)
+    des[inside] = 'hits an inside-the-park home run to center field.'
+
+    win_exp = np.where(last, np.round(rng.normal(0, .045, n), 3), 0.0)
+
+    pitch_game = pa_game[pa]
+    home_team = np.array(TEAMS, dtype=object)[matchups[pitch_game, 0]]
+    away_team = np.array(TEAMS, dtype=object)[matchups[pitch_game, 1]]
+    top = pa_top[pa]
+    home_before = (home_after - home_runs)[pa]
+    away_before = (away_after - away_runs)[pa]
+
+    df = pd.DataFrame({
+        'pitch_type': pitch_type,
+        'game_date': pd.Timestamp(start) + pd.to_timedelta(game_day[pitch_game], unit='D'),
+        'release_speed': speed,
+        'release_pos_x': np.round(rng.normal(-1.5, 1.2, n), 2),
+        'release_pos_z': np.round(rng.normal(5.8, .4, n), 2),
+        'batter': pa_batter[pa],
+        'pitcher': pa_pitcher[pa],
+        'events': event,
+        'description': description,
+        'des': des,
+        'stand': rng.choice(['L', 'R'], n, p=[.42, .58]),
+        'home_team': home_team,
+        'away_team': away_team,
+        'balls': rng.integers(0, 4, n),
+        'strikes': rng.integers(0, 3, n),
+        'pfx_x': np.round(rng.normal(0, .8, n), 2),
+        'pfx_z': np.round(rng.normal(.9, .6, n), 2),
+        'plate_x': np.round(rng.normal(0, .85, n), 2),
+        'plate_z': np.round(rng.normal(2.4, .9, n), 2),
+        'outs_when_up': pa_outs[pa],
+        'inning': half_inning[pa_half][pa],
+        'inning_topbot': np.where(top, 'Top', 'Bot'),
+        'hit_distance_sc': hit_distance,
+        'launch_speed': launch_speed,
+        'launch_angle': launch_angle,
+        'release_spin_rate': spin,
+        'game_pk': 660000 + pitch_game + seed * 100000,
+        'release_pos_y': np.round(rng.normal(54.0, .5, n), 2),
+        'at_bat_number': pa_number[pa],
+        'pitch_number': pitch_number,
+        'home_score': home_before,
+        'away_score': away_before,
+        'post_home_score': np.where(last, home_after[pa], home_before),
+        'post_away_score': np.where(last, away_after[pa], away_before),
+        'delta_home_win_exp': win_exp,
+    })
+
+    if raw:
+        df.insert(5, 'player_name', df['batter'].map(comma_names))
+        return df
+
+    df['batter_name'] = df['batter'].map(full_names)
+    df['pitcher_name'] = df['pitcher'].map(full_names)
+    df['batter_team'] = np.where(top, away_team, home_team)
+    df['pitcher_team'] = np.where(top, home_team, away_team)
+
+    return df
+
+
+
+def generate_scale(scale, seed=0, raw=False):
+    """This function generates one of the SCALES ('day', 'week', 'season' or 'multi_season')."""
+
+    return generate_pitches(SCALES[scale], seed=seed, raw=raw)
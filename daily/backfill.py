@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Rebuilds the stored days (and their leaderboards) for a date range, e.g.
+#   python backfill.py 2022-04-07 2022-10-05 --workers 8
+
+import os
+import json
+import time
+import argparse
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from daily_functions import clean_data, leaderboards
+from player_registry import load_player_data
+from pitch_store import STORE_ROOT, ingest_day
+from statcast_fetch import fetch_day
+
+
+# finished days are listed here so a restarted backfill picks up where it stopped
+CHECKPOINT_FILE = os.path.join('data', 'backfill_days.json')
+# each day's leaderboards, laid out as {root}/{season}/{YYYY-MM-DD}/{category}.parquet
+LEADERBOARD_ROOT = os.path.join('data', 'daily_leaderboards')
+
+
+def read_fixture(folder, day):
+    for ext in ['.parquet', '.csv']:
+        path = os.path.join(folder, f"{day}{ext}")
+        if os.path.exists(path):
+            return pd.read_parquet(path) if ext == '.parquet' else pd.read_csv(path)
+
+    # no file means no games that day
+    return pd.DataFrame()
+
+
+
+def fixture_source(folder):
+    """This function returns a source that reads {folder}/{YYYY-MM-DD}.parquet (or .csv) instead of downloading."""
+
+    return partial(read_fixture, folder)
+
+
+
+def load_checkpoint(path=CHECKPOINT_FILE):
+    if not os.path.exists(path):
+        return set()
+
+    with open(path) as f:
+        return set(json.load(f))
+
+
+
+def save_checkpoint(days, path=CHECKPOINT_FILE):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    # write then rename, so a crash mid-write never loses the days already recorded
+    with open(path + '.tmp', 'w') as f:
+        json.dump(sorted(days), f)
+    os.replace(path + '.tmp', path)
+
+
+
+def backfill_day(day, source, player_data, root=STORE_ROOT, leaderboard_root=LEADERBOARD_ROOT):
+    """This function runs the daily pipeline for one past day: fetch, clean_data, save, and leaderboards.
+
+    Returns the day and how many pitches were stored (0 on days without games).
+    """
+
+    data = source(day)
+    if len(data) == 0:
+        return day, 0
+
+    df = clean_data(data, player_data)
+    df = ingest_day(df, day, root)
+
+    results, timings = leaderboards(df)
+    folder = os.path.join(leaderboard_root, day[:4], day)
+    os.makedirs(folder, exist_ok=True)
+    for name, frame in results.items():
+        frame.to_parquet(os.path.join(folder, f"{name}.parquet"))
+
+    return day, len(df)
+
+
+
+def backfill(start, end, source=fetch_day, workers=None, checkpoint=CHECKPOINT_FILE,
+             root=STORE_ROOT, leaderboard_root=LEADERBOARD_ROOT, player_data=None):
+    """This function backfills every day from start to end (inclusive) in a process pool.
+
+    source fetches one day of raw Statcast data given 'YYYY-MM-DD' (fetch_day, which caches downloads,
+    fixture_source(folder) or any picklable function). Days already in the checkpoint file are skipped
+    and each finished day is added as it completes. Players missing from the register show as "Unknown" (no live lookups are made from the pool).
+    Like render_graphics, the pool forks, and platforms without fork run the days one at a time.
+    Neighbouring days running at the same time aren't checked against each other for repeated pitches (see ingest_day),
+    so workers=1 gives the strictest dedup.
+    Returns the number of pitches stored for each day processed.
+    """
+
+    if workers is None:
+        workers = os.cpu_count()
+    if player_data is None:
+        player_data = load_player_data()
+
+    done = load_checkpoint(checkpoint)
+    days = [day.strftime('%Y-%m-%d') for day in pd.date_range(start, end)]
+    todo = [day for day in days if day not in done]
+    print(f"{len(days) - len(todo)} of {len(days)} days already done, {len(todo)} to go")
+
+    start_time = time.perf_counter()
+    pitches = {}
+
+    def finish(day, count):
+        pitches[day] = count
+        done.add(day)
+        save_checkpoint(done, checkpoint)
+        minutes = (time.perf_counter() - start_time) / 60
+        print(f"{day}: {count} pitches ({len(pitches)}/{len(todo)} days, {len(pitches) / minutes:.1f} days/min)")
+
+    if workers <= 1 or len(todo) <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        for day in todo:
+            finish(*backfill_day(day, source, player_data, root, leaderboard_root))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo)), mp_context=multiprocessing.get_context('fork')) as pool:
+            futures = [pool.submit(backfill_day, day, source, player_data, root, leaderboard_root) for day in todo]
+            for future in as_completed(futures):
+                finish(*future.result())
+
+    return pitches
+
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backfill stored Statcast days and their leaderboards.')
+    parser.add_argument('start', help='first day (YYYY-MM-DD)')
+    parser.add_argument('end', help='last day (YYYY-MM-DD)')
+    parser.add_argument('--workers', type=int, default=None, help='processes to use (default: all cores)')
+    parser.add_argument('--fixtures', default=None, help='read days from this folder instead of downloading')
+    parser.add_argument('--checkpoint', default=CHECKPOINT_FILE)
+    args = parser.parse_args()
+
+    source = fixture_source(args.fixtures) if args.fixtures else fetch_day
+    backfill(args.start, args.end, source, args.workers, args.checkpoint)
@@ -1,48 +1,118 @@
 import pandas as pd
+import numpy as np
 import os
+import time
 from datetime import date
 from datetime import timedelta
+from enrichment import add_teams, drop_duplicate_pitches
 
 
-def add_name(mlb_ID, player_data):
-    player_row = player_data[player_data.key_mlbam==mlb_ID]
-    try:
-        full_name = f"{player_row['name_first'].iloc[0]} {player_row['name_last'].iloc[0]}"
-    except:
-        # players making their debuts may take a week to show up here
-        return "Unknown"
-    return full_name
+def build_name_index(player_data):
+    """This function builds a key_mlbam -> full name lookup from the player register.
+    
+    Duplicate IDs keep their first row.
+    """
+    
+    players = player_data.drop_duplicates(subset=['key_mlbam'])
+    full_names = players['name_first'].astype(str) + ' ' + players['name_last'].astype(str)
+    full_names.index = players['key_mlbam']
+    
+    return full_names
 
 
 
-def add_batter_team(row):
-    if row.inning_topbot == 'Top':
-        return row.away_team
-    else:
-        return row.home_team
+def add_names(mlb_IDs, name_index):
+    """This function resolves a whole column of MLBAM IDs to full names at once.
     
+    players making their debuts may take a week to show up in the register, so they come back as "Unknown".
+    """
+    
+    return mlb_IDs.map(name_index).fillna("Unknown")
 
 
-def add_pitcher_team(row):
-    if row.inning_topbot == 'Top':
-        return row.home_team
-    else:
-        return row.away_team
 
+def clean_data(df, player_data, report=False):
+    name_index = build_name_index(player_data)
+    df['batter_name'] = add_names(df['batter'], name_index)
+    df['pitcher_name'] = add_names(df['pitcher'], name_index)
+    df = add_teams(df)
+    df = df.drop(columns=['player_name'])
+    df = apply_schema(df, report)
+    df = drop_duplicate_pitches(df)[0]
+    return df
 
 
-def clean_data(df, player_data):
-    df['batter_name'] = df['batter'].apply(add_name, args=(player_data,))
-    df['pitcher_name'] = df['pitcher'].apply(add_name, args=(player_data,))
-    df['batter_team'] = df.apply(lambda row: add_batter_team(row), axis=1)
-    df['pitcher_team'] = df.apply(lambda row: add_pitcher_team(row), axis=1)
-    df = df[df.duplicated(subset=['pitcher_name', 'release_speed', 'release_pos_x', 'release_pos_y',
-                                  'description', 'release_spin_rate']) == False]
-    df = df.drop(columns=['player_name'])
+
+# the cleaned pitch frame: only the columns the leaderboards, tweets and graphics read, in lean dtypes
+TEAM_COLUMNS = ['home_team', 'away_team', 'batter_team', 'pitcher_team']
+CATEGORY_COLUMNS = ['pitch_type', 'events', 'description', 'stand', 'inning_topbot'] + TEAM_COLUMNS
+FLOAT32_COLUMNS = ['release_speed', 'release_pos_x', 'release_pos_y', 'release_spin_rate', 'launch_speed',
+                   'launch_angle', 'hit_distance_sc', 'pfx_x', 'pfx_z', 'plate_x', 'plate_z']
+INT_COLUMNS = {'game_pk': 'int32', 'batter': 'int32', 'pitcher': 'int32', 'at_bat_number': 'int16',
+               'pitch_number': 'int8', 'inning': 'int8', 'outs_when_up': 'int8', 'balls': 'int8', 'strikes': 'int8',
+               'home_score': 'int16', 'away_score': 'int16', 'post_home_score': 'int16', 'post_away_score': 'int16'}
+# kept as is: win probability changes are small differences, so they stay float64
+OTHER_COLUMNS = ['game_date', 'des', 'delta_home_win_exp', 'batter_name', 'pitcher_name']
+PITCH_COLUMNS = CATEGORY_COLUMNS + FLOAT32_COLUMNS + list(INT_COLUMNS) + OTHER_COLUMNS
+
+
+def apply_schema(df, report=False):
+    """This function drops the columns nothing reads and stores the rest in smaller dtypes.
+    
+    Floats measured to a decimal or two go to float32, counts and IDs to the smallest int that fits
+    (columns with missing values stay float), and repeated codes (teams, events, pitch types) become categoricals.
+    report prints the frame's memory before and after.
+    """
+    
+    before = df.memory_usage(deep=True).sum()
+    
+    df = df[[col for col in df.columns if col in PITCH_COLUMNS]].copy()
+    # the team columns share one set of categories so they can be compared with each other
+    teams = [col for col in TEAM_COLUMNS if col in df.columns]
+    team_dtype = pd.CategoricalDtype(sorted(pd.unique(df[teams].stack().astype(str)))) if teams else None
+    for col in df.columns:
+        if col in TEAM_COLUMNS:
+            df[col] = df[col].astype(team_dtype)
+        elif col in CATEGORY_COLUMNS:
+            df[col] = df[col].astype('category')
+        elif col in FLOAT32_COLUMNS:
+            df[col] = df[col].astype('float32')
+        elif col in INT_COLUMNS:
+            df[col] = df[col].astype(INT_COLUMNS[col] if df[col].notna().all() else 'float32')
+    
+    if report:
+        after = df.memory_usage(deep=True).sum()
+        print(f"memory: {before / 2**20:.1f} MB -> {after / 2**20:.1f} MB")
+    
     return df
 
 
 
+def top_n(df, key, n, ascending=False):
+    """This function returns the first n rows of df sorted by key, without sorting the whole frame.
+    
+    key is a column name or a Series lined up with df.
+    ties and missing values come out in the same order a stable sort would give them.
+    """
+    
+    if isinstance(key, str):
+        key = df[key]
+    key = key.reset_index(drop=True)
+    
+    valid = key.dropna()
+    if ascending:
+        top = valid.nsmallest(n, keep='first')
+    else:
+        top = valid.nlargest(n, keep='first')
+    
+    positions = list(top.index)
+    if len(positions) < n:
+        positions += list(key.index[key.isna()][:n - len(positions)])
+    
+    return df.iloc[positions]
+
+
+
 def homer_distance(df, n=5, bottom=False, all_data=False):
     """This function returns the extreme homer distances of the day.
     
@@ -51,13 +121,16 @@ def homer_distance(df, n=5, bottom=False, all_data=False):
     all_data returns every result, but sorted.
     """
     
-    homers = df[df.events == 'home_run'].sort_values(by='hit_distance_sc', ascending=bottom)
+    homers = df[df.events == 'home_run']
+    
+    if all_data:
+        homers = homers.sort_values(by='hit_distance_sc', ascending=bottom, kind='stable')
+    else:
+        homers = top_n(homers, 'hit_distance_sc', n, ascending=bottom)
 
     homers = homers[['batter_name', 'batter_team', 'hit_distance_sc', 'launch_angle',
                    'pitcher_name', 'pitcher_team', 'release_speed', 'pitch_type', 'game_date']]
     
-    homers = homers.iloc[:n]
-    
     return homers
 
 
@@ -72,10 +145,15 @@ def pitch_speed(df, n=5, bottom=False, all_data=False, only_events=False, unique
     unique returns only 1 result per pitcher.
     """
     
-    pitch = df.dropna(subset=['release_speed']).sort_values(by='release_speed', ascending=bottom)
+    pitch = df.dropna(subset=['release_speed'])
     
     if only_events:
         pitch = pitch[pitch.events.notnull()]
+    
+    if all_data or unique:
+        pitch = pitch.sort_values(by='release_speed', ascending=bottom, kind='stable')
+    else:
+        pitch = top_n(pitch, 'release_speed', n, ascending=bottom)
         
     pitch = pitch[['pitcher_name', 'pitcher_team', 'release_speed', 'launch_angle', 'events',
                    'description', 'pitch_type', 'batter_name', 'batter_team', 'game_date']]
@@ -100,19 +178,42 @@ def launch_speed(df, n=5, bottom=False, all_data=False, only_events=False):
     only_events can be used to filter by pitches ending in an event.
     """
     
-    launch = df.dropna(subset=['launch_speed']).sort_values(by='launch_speed', ascending=bottom)
+    launch = df.dropna(subset=['launch_speed'])
     
     if only_events:
         launch = launch[launch.events.notnull()]
+    
+    if all_data:
+        launch = launch.sort_values(by='launch_speed', ascending=bottom, kind='stable')
+    else:
+        launch = top_n(launch, 'launch_speed', n, ascending=bottom)
         
     launch = launch[['batter_name', 'batter_team', 'launch_speed', 'launch_angle', 'events',
                      'description', 'pitch_type', 'pitcher_name', 'pitcher_team', 'game_date']]
-        
-    if all_data:
-        return launch
-    else:
-        launch = launch.iloc[:n]
-        return launch
+    
+    return launch
+
+
+
+def plate_appearances(df, date=False):
+    """This function builds one row per at-bat with its pitch count and the event that ended it.
+    
+    The count is in the pitch_type column. The event is the first one recorded for the batter in that
+    inning/outs/game, in frame order. At-bats that never recorded an event show "left for injury".
+    date also keys the at-bats by game_date (for frames covering more than one day, like the yearly ones).
+    """
+    
+    keys = ['batter_name', 'batter_team', 'inning', 'outs_when_up', 'game_pk']
+    if date:
+        keys.append('game_date')
+    seen = df.groupby(by=keys, observed=True)['pitch_type'].count().to_frame().reset_index()
+    
+    event_keys = ['batter_name', 'inning', 'outs_when_up', 'game_pk']
+    events = df.groupby(by=event_keys, observed=True)['events'].first()
+    seen = seen.join(events, on=event_keys)
+    seen['events'] = seen['events'].astype(object).fillna("left for injury")
+    
+    return seen
 
 
 
@@ -125,31 +226,13 @@ def pitches_seen(df, n=5, atbat=False, pitch_type=False):
     """
     
     if atbat:
-        grouped = df.groupby(by=['batter_name', 'batter_team', 'inning', 'outs_when_up', 'game_pk'])
-        seen = grouped.count()[['pitch_type']].sort_values(by='pitch_type', ascending=False).reset_index().iloc[:n]
-        
-        event_list = []
-        for i, row in seen.iterrows():
-            df_new = df[(df.batter_name==row.batter_name)&(df.inning==row.inning)&(df.outs_when_up==row.outs_when_up)&(df.game_pk==row.game_pk)]
-            event = df_new.iloc[0].events
-
-            if pd.isnull(event):
-                try:
-                    event = df_new[df_new.events.notnull()].events.iloc[0]
-                except IndexError:
-                    event = "left for injury"
-
-            event_list.append(event)
-            
-        seen['events'] = event_list
-        
-        return seen
+        return top_n(plate_appearances(df), 'pitch_type', n).reset_index(drop=True)
     
     if pitch_type:
-        seen = df.groupby(by=['batter_name', 'pitch_type']).count()[['description']].sort_values(by='description', ascending=False)
+        seen = df.groupby(by=['batter_name', 'pitch_type'], observed=True).count()[['description']].sort_values(by='description', ascending=False)
         seen.reset_index(inplace=True)
     else:
-        seen = df.groupby(by=['batter_name', 'batter_team']).count()[['description']].sort_values(by='description', ascending=False)
+        seen = df.groupby(by=['batter_name', 'batter_team'], observed=True).count()[['description']].sort_values(by='description', ascending=False)
         seen.reset_index(inplace=True)
     
     return seen.iloc[:n]
@@ -163,183 +246,214 @@ def win_prob(df, n=5, all_data=False, extra=False):
     all_data returns every result, but sorted.
     """
     
-    win_prob = df.copy(deep=True)
-    win_prob = win_prob[~win_prob['events'].isna()]
+    win_prob = df[~df['events'].isna()]
+    swing = abs(win_prob['delta_home_win_exp'])*100
     
+    if all_data:
+        win_prob = win_prob.iloc[swing.reset_index(drop=True).sort_values(ascending=False, kind='stable').index]
+    else:
+        win_prob = top_n(win_prob, swing, n)
+    
+    win_prob = win_prob.copy()
     win_prob['delta_home_win_exp'] = abs(win_prob['delta_home_win_exp'])*100
-    win_prob = win_prob.sort_values(by='delta_home_win_exp', ascending=False)
 
     if not extra:
         win_prob = win_prob[['batter_name', 'batter_team', 'events', 'delta_home_win_exp',
                    'pitcher_name', 'pitcher_team', 'release_speed', 'pitch_type', 'game_date']]
     
-    win_prob = win_prob.iloc[:n]
-    
     return win_prob
 
 
 
+# win_prob with the batter's side of the swing, used for the playoff game cards
+win_prob_columns = ['batter_name', 'batter_team', 'home_team', 'batter_home', 'home_win_pct',
+                    'batter_win_pct_str', 'events', 'pitcher_name', 'pitcher_team', 'release_speed', 'pitch_type', 'game_date']
 
 
-def create_homer_high_tweet(homer_distance_high, socials):
-    strings = []
-    date_str = (date.today() - timedelta(days=1)).strftime('%#m/%#d/%y')
-        
-    for i in range(3):
-        name = homer_distance_high.iloc[i,0]
-        team = homer_distance_high.iloc[i,1]
-        distance = str(homer_distance_high.iloc[i,2])
-
-        string = f"{str(i+1)}. {name} {socials[team]['at']}\n    {distance} ft\n    {socials[team]['hashtag']}\n"
-        strings.append(string)
-
-    text = '\n'.join(strings)
-    text = f"Longest Homers 💣\n({date_str})\n\n" + text
+def win_prob_v2(df, n=5, all_data=False, extra=False):
+    """This function returns the largest changes in win percentage of the day.
     
-    return text
-
-
-
-def create_homer_low_tweet(homer_distance_low, socials):
-    strings = []
-    date_str = (date.today() - timedelta(days=1)).strftime('%#m/%#d/%y')
-
-    for i in range(3):
-        name = homer_distance_low.iloc[i,0]
-        team = homer_distance_low.iloc[i,1]
-        distance = str(homer_distance_low.iloc[i,2])
-
-        string = f"{str(i+1)}. {name} {socials[team]['at']}\n    {distance} ft\n    {socials[team]['hashtag']}\n"
-        strings.append(string)
-
-    text = '\n'.join(strings)
-    text = f"Shortest Homers 📏\n({date_str})\n\n" + text
-
-    return text
-
-
-
-def create_pitch_high_tweet(pitch_speed_high, socials):
-    strings = []
-    date_str = (date.today() - timedelta(days=1)).strftime('%#m/%#d/%y')
-
-    for i in range(3):
-        name = pitch_speed_high.iloc[i,0]
-        team = pitch_speed_high.iloc[i,1]
-        speed = pitch_speed_high.iloc[i,2]
-        event = pitch_speed_high.iloc[i,5].replace('_', ' ')
-
-        string = f"{str(i+1)}. {name} {socials[team]['at']}\n    {speed} mph ({event})\n    {socials[team]['hashtag']}\n"
-        strings.append(string)
-
-    text = '\n'.join(strings)
-    text = f"Fastest Pitches 🔥\n({date_str})\n\n" + text
-
-    return text
-
-
-
-def create_pitch_low_tweet(pitch_speed_low, socials):
-    strings = []
-    date_str = (date.today() - timedelta(days=1)).strftime('%#m/%#d/%y')
-
-    for i in range(3):
-        name = pitch_speed_low.iloc[i,0]
-        team = pitch_speed_low.iloc[i,1]
-        speed = pitch_speed_low.iloc[i,2]
-        event = pitch_speed_low.iloc[i,5].replace('_', ' ')
-
-        string = f"{str(i+1)}. {name} {socials[team]['at']}\n    {speed} mph ({event})\n    {socials[team]['hashtag']}\n"
-        strings.append(string)
-
-    text = '\n'.join(strings)
-    text = f"Slowest Pitches 🐌\n({date_str})\n\n" + text
-
-    return text
-
-
-
-def create_ev_high_tweet(launch_speed_high, socials):
-    strings = []
-    date_str = (date.today() - timedelta(days=1)).strftime('%#m/%#d/%y')
-
-    for i in range(3):
-        name = launch_speed_high.iloc[i,0]
-        team = launch_speed_high.iloc[i,1]
-        speed = launch_speed_high.iloc[i,2]
-        event = launch_speed_high.iloc[i,4].replace('_', ' ')
-
-        string = f"{str(i+1)}. {name} {socials[team]['at']}\n    {speed} mph ({event})\n    {socials[team]['hashtag']}\n"
-        strings.append(string)
-
-    text = '\n'.join(strings)
-    text = f"Highest Exit Velocity 🚀\n({date_str})\n\n" + text
-
-    return text
-
-
-
-def create_ev_low_tweet(launch_speed_low, socials):
-    strings = []
-    date_str = (date.today() - timedelta(days=1)).strftime('%#m/%#d/%y')
-
-    for i in range(3):
-        name = launch_speed_low.iloc[i,0]
-        team = launch_speed_low.iloc[i,1]
-        speed = launch_speed_low.iloc[i,2]
-        event = launch_speed_low.iloc[i,4].replace('_', ' ')
-
-        string = f"{str(i+1)}. {name} {socials[team]['at']}\n    {speed} mph ({event})\n    {socials[team]['hashtag']}\n"
-        strings.append(string)
-
-    text = '\n'.join(strings)
-    text = f"Lowest Exit Velocity 🐢\n({date_str})\n\n" + text
+    n controls how many results are returned.
+    all_data returns every result, but sorted.
+    """
+    
+    win_prob = df.copy(deep=True)
+    win_prob = win_prob[~win_prob['events'].isna()]
+    
+    win_prob['home_win_pct_abs'] = abs(win_prob['delta_home_win_exp'])*100
+    win_prob['home_win_pct'] = win_prob['delta_home_win_exp']*100
+    win_prob = win_prob.sort_values(by='home_win_pct_abs', ascending=False)
+    win_prob['batter_home'] = win_prob['batter_team']==win_prob['home_team']
+    win_prob['batter_win_pct'] = np.where(win_prob['batter_home'], round(win_prob['home_win_pct'],1), -1*round(win_prob['home_win_pct'],1))
+    win_prob['batter_win_+-'] = np.where(win_prob['batter_win_pct']>0, "+", "")
+    win_prob['batter_win_pct_str'] = win_prob['batter_win_+-'] + win_prob['batter_win_pct'].astype(str)
+    
+    if not extra:
+        win_prob = win_prob[win_prob_columns]
+    
+    win_prob = win_prob.iloc[:n]
+    
+    return win_prob
 
-    return text
 
 
 
-def create_atbat_long_tweet(pitches_seen_atbat_high, socials):
-    strings = []
-    date_str = (date.today() - timedelta(days=1)).strftime('%#m/%#d/%y')
 
-    for i in range(3):
-        name = pitches_seen_atbat_high.iloc[i,0]
-        team = pitches_seen_atbat_high.iloc[i,1]
-        pitches = pitches_seen_atbat_high.iloc[i,5]
-        event = pitches_seen_atbat_high.iloc[i,6].replace('_', ' ')
+# the daily leaderboards, in the order they are tweeted
+DAILY_CATEGORIES = [
+    {'name': 'homer_distance_high',     'function': homer_distance, 'kwargs': {}},
+    {'name': 'homer_distance_low',      'function': homer_distance, 'kwargs': {'bottom': True}},
+    {'name': 'pitch_speed_high',        'function': pitch_speed,    'kwargs': {}},
+    {'name': 'pitch_speed_low',         'function': pitch_speed,    'kwargs': {'bottom': True}},
+    {'name': 'launch_speed_high',       'function': launch_speed,   'kwargs': {'only_events': True}},
+    {'name': 'launch_speed_low',        'function': launch_speed,   'kwargs': {'bottom': True, 'only_events': True}},
+    {'name': 'pitches_seen_atbat_high', 'function': pitches_seen,   'kwargs': {'atbat': True}},
+    {'name': 'win_prob_high',           'function': win_prob,       'kwargs': {}},
+]
 
-        string = f"{str(i+1)}. {name} {socials[team]['at']}\n    {pitches} ({event})\n    {socials[team]['hashtag']}\n"
-        strings.append(string)
+ATBAT_COLUMNS = ['batter_name', 'batter_team', 'inning', 'outs_when_up', 'game_pk', 'pitch_type', 'events']
 
-    text = '\n'.join(strings)
-    text = f"Longest At-Bats [# of Pitches] ⏳\n({date_str})\n\n" + text
 
-    return text
+def view_key(function, kwargs):
+    """This function names the smallest slice of the day a category needs to give its normal answer."""
+    
+    if function is homer_distance:
+        return ('home_run',)
+    if function is pitch_speed:
+        return ('release_speed', 'events') if kwargs.get('only_events') else ('release_speed',)
+    if function is launch_speed:
+        return ('launch_speed', 'events') if kwargs.get('only_events') else ('launch_speed',)
+    if function is win_prob:
+        return ('events',)
+    if function is pitches_seen and kwargs.get('atbat'):
+        return ('atbat_columns',)
+    return ()
+
+
+
+def leaderboards(df, categories=DAILY_CATEGORIES):
+    """This function runs several leaderboard functions over one day's frame in a single pass.
+    
+    categories is a list of dicts with a name, a leaderboard function, and its kwargs.
+    Row filters are worked out once from NumPy columns and shared between categories that need the same slice,
+    so each function only sees the rows that can make its leaderboard and returns what it would on the full frame.
+    Returns a dict of results and a dict of seconds spent per category (plus 'shared_views').
+    """
+    
+    start = time.perf_counter()
+    events = df['events'].to_numpy()
+    masks = {
+        'events': pd.notnull(events),
+        'home_run': events == 'home_run',
+        'release_speed': pd.notnull(df['release_speed'].to_numpy()),
+        'launch_speed': pd.notnull(df['launch_speed'].to_numpy()),
+    }
+    
+    views = {(): df, ('atbat_columns',): df[ATBAT_COLUMNS]}
+    for category in categories:
+        key = view_key(category['function'], category['kwargs'])
+        if key not in views:
+            mask = np.logical_and.reduce([masks[part] for part in key])
+            views[key] = df[mask]
+    timings = {'shared_views': time.perf_counter() - start}
+    
+    results = {}
+    for category in categories:
+        start = time.perf_counter()
+        view = views[view_key(category['function'], category['kwargs'])]
+        results[category['name']] = category['function'](view, **category['kwargs'])
+        timings[category['name']] = time.perf_counter() - start
+    
+    return results, timings
+
+
+
+# how each leaderboard is written up as a tweet
+#   name/team/value/event are the columns shown for each leader (event is optional)
+#   unit follows the value, and digits rounds it (None leaves it as is)
+TWEET_CATEGORIES = {
+    'homer_distance_high':     {'title': 'Longest Homers', 'emoji': '💣', 'name': 'batter_name', 'team': 'batter_team',
+                                'value': 'hit_distance_sc', 'unit': ' ft', 'event': None, 'digits': None},
+    'homer_distance_low':      {'title': 'Shortest Homers', 'emoji': '📏', 'name': 'batter_name', 'team': 'batter_team',
+                                'value': 'hit_distance_sc', 'unit': ' ft', 'event': None, 'digits': None},
+    'pitch_speed_high':        {'title': 'Fastest Pitches', 'emoji': '🔥', 'name': 'pitcher_name', 'team': 'pitcher_team',
+                                'value': 'release_speed', 'unit': ' mph', 'event': 'description', 'digits': None},
+    'pitch_speed_low':         {'title': 'Slowest Pitches', 'emoji': '🐌', 'name': 'pitcher_name', 'team': 'pitcher_team',
+                                'value': 'release_speed', 'unit': ' mph', 'event': 'description', 'digits': None},
+    'launch_speed_high':       {'title': 'Highest Exit Velocity', 'emoji': '🚀', 'name': 'batter_name', 'team': 'batter_team',
+                                'value': 'launch_speed', 'unit': ' mph', 'event': 'events', 'digits': None},
+    'launch_speed_low':        {'title': 'Lowest Exit Velocity', 'emoji': '🐢', 'name': 'batter_name', 'team': 'batter_team',
+                                'value': 'launch_speed', 'unit': ' mph', 'event': 'events', 'digits': None},
+    'pitches_seen_atbat_high': {'title': 'Longest At-Bats [# of Pitches]', 'emoji': '⏳', 'name': 'batter_name', 'team': 'batter_team',
+                                'value': 'pitch_type', 'unit': '', 'event': 'events', 'digits': None},
+    'win_prob_high':           {'title': 'Largest Changes in Win Probability', 'emoji': '📈', 'name': 'batter_name', 'team': 'batter_team',
+                                'value': 'delta_home_win_exp', 'unit': '%', 'event': 'events', 'digits': 1},
+}
+
+TWEET_MAX_LENGTH = 280
+
+
+def tweet_length(text):
+    """This function counts characters the way Twitter does: most scripts count once, emoji and CJK count twice."""
+    
+    length = 0
+    for char in text:
+        point = ord(char)
+        if point <= 4351 or 8192 <= point <= 8205 or 8208 <= point <= 8223 or 8242 <= point <= 8247:
+            length += 1
+        elif 0xFE00 <= point <= 0xFE0F:
+            # variation selectors ride along with the emoji before them
+            continue
+        else:
+            length += 2
+    
+    return length
 
 
 
-def create_win_prob_tweet(win_prob_high, socials):
+def create_tweet(frame, category, socials, date_str=None, n=3, categories=TWEET_CATEGORIES):
+    """This function writes up the top of a leaderboard as a tweet, using the category's entry in TWEET_CATEGORIES.
+    
+    n controls how many leaders are listed; lower leaders are dropped if the tweet would run over 280 characters.
+    date_str defaults to yesterday (e.g. a week range can be passed instead).
+    """
+    
+    spec = categories[category]
+    if date_str is None:
+        date_str = (date.today() - timedelta(days=1)).strftime('%#m/%#d/%y')
+    
+    # pull the shown columns out once rather than reading cell by cell
+    top = frame.iloc[:n]
+    names = top[spec['name']].to_numpy()
+    teams = top[spec['team']].to_numpy()
+    values = top[spec['value']].to_numpy()
+    events = top[spec['event']].to_numpy() if spec['event'] is not None else [None] * len(top)
+    
     strings = []
-    date_str = (date.today() - timedelta(days=1)).strftime('%#m/%#d/%y')
-
-    for i in range(3):
-        name = win_prob_high.iloc[i,0]
-        team = win_prob_high.iloc[i,1]
-        try:
-            event = win_prob_high.iloc[i,2].replace('_', ' ')
-        except:
+    for i, (name, team, value, event) in enumerate(zip(names, teams, values, events)):
+        if spec['event'] is not None and not isinstance(event, str):
             continue
-            
-        prob = win_prob_high.iloc[i,3]
-        string = f"{str(i+1)}. {name} {socials[team]['at']}\n    {round(prob,1)}% ({event})\n    {socials[team]['hashtag']}\n"
-
-        strings.append(string)
-
-    text = '\n'.join(strings)
-    text = f"Largest Changes in Win Probability 📈\n({date_str})\n\n" + text
-
+        if spec['digits'] is not None:
+            value = round(value, spec['digits'])
+        
+        # str() rather than an f-string, which would print float32 values at full precision
+        line = str(value) + spec['unit']
+        if event is not None:
+            line += f" ({event.replace('_', ' ')})"
+        strings.append(f"{str(i+1)}. {name} {socials[team]['at']}\n    {line}\n    {socials[team]['hashtag']}\n")
+    
+    header = f"{spec['title']} {spec['emoji']}\n({date_str})\n\n"
+    text = header + '\n'.join(strings)
+    while tweet_length(text) > TWEET_MAX_LENGTH and len(strings) > 1:
+        strings.pop()
+        text = header + '\n'.join(strings)
+    
     return text
 
 
 
+def create_tweets(results, socials, date_str=None, categories=DAILY_CATEGORIES):
+    """This function writes a tweet for each leaderboard in results (from leaderboards), in category order."""
+    
+    return [create_tweet(results[category['name']], category['name'], socials, date_str) for category in categories]
+
@@ -0,0 +1,68 @@
+import pandas as pd
+import numpy as np
+
+
+# shared by daily_functions.clean_data and yearly_functions.load_data
+
+def add_teams(df):
+    """This function adds batter_team and pitcher_team to every pitch at once.
+
+    The away team bats in the top of the inning and the home team in the bottom.
+    """
+
+    top = (df['inning_topbot'] == 'Top').to_numpy()
+    home = df['home_team'].to_numpy()
+    away = df['away_team'].to_numpy()
+
+    df['batter_team'] = np.where(top, away, home)
+    df['pitcher_team'] = np.where(top, home, away)
+
+    return df
+
+
+
+def format_names(names):
+    """This function turns "Last, First" names into "First Last".
+
+    Each distinct name is reformatted once and mapped back onto the column, since a season repeats
+    the same few thousand names hundreds of thousands of times.
+    """
+
+    unique = pd.Series(pd.unique(names.dropna()))
+    parts = unique.str.split(',')
+    formatted = parts.str[-1].str[1:] + ' ' + parts.str[0]
+
+    return names.map(pd.Series(formatted.to_numpy(), index=unique.to_numpy()))
+
+
+
+# one pitch: the game, the plate appearance within it and the pitch within that
+# (the key the batter and pitcher files are joined on, and what makes two rows the same pitch)
+PITCH_KEYS = ['game_pk', 'at_bat_number', 'pitch_number']
+FINGERPRINT_COLUMNS = PITCH_KEYS
+
+
+def pitch_fingerprints(df):
+    """This function hashes each pitch's FINGERPRINT_COLUMNS into one 64-bit number (a numpy uint64 array).
+
+    The keys are hashed as int64, so a pitch gets the same fingerprint whatever dtypes the frame is stored in.
+    """
+
+    return pd.util.hash_pandas_object(df[FINGERPRINT_COLUMNS].astype('int64'), index=False).to_numpy()
+
+
+
+def drop_duplicate_pitches(df, seen=None):
+    """This function drops repeated pitches, keeping the first time each one shows up.
+
+    seen is an array of fingerprints already stored elsewhere (e.g. other days); pitches matching it are dropped too.
+    Returns the remaining pitches and their fingerprints.
+    """
+
+    fingerprints = pd.Series(pitch_fingerprints(df))
+    duplicate = fingerprints.duplicated()
+    if seen is not None and len(seen):
+        duplicate |= fingerprints.isin(seen)
+
+    keep = ~duplicate.to_numpy()
+    return df[keep], fingerprints.to_numpy()[keep]
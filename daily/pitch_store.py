@@ -0,0 +1,112 @@
+import pandas as pd
+import os
+import glob
+import numpy as np
+from daily_functions import apply_schema
+from enrichment import FINGERPRINT_COLUMNS, pitch_fingerprints, drop_duplicate_pitches
+
+
+# root folder of the stored daily data, laid out as {root}/{season}/{YYYY-MM-DD}.parquet
+# (daily/data/daily_data_v2 by default, wherever the script runs from, so the yearly code reads the same days)
+STORE_ROOT = os.environ.get('STATCAST_STORE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'daily_data_v2'))
+# how many days either side of a new day are checked for pitches it repeats
+NEIGHBOUR_DAYS = 1
+
+
+def partition_path(day, root=STORE_ROOT):
+    day = pd.Timestamp(day).strftime('%Y-%m-%d')
+    return os.path.join(root, day[:4], f"{day}.parquet")
+
+
+
+def write_day(df, day, root=STORE_ROOT):
+    """This function saves one day of cleaned pitches as a compressed parquet partition.
+
+    Rewriting a day replaces its partition, so reruns don't pile up duplicates.
+    """
+
+    path = partition_path(day, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    df = df.reset_index(drop=True)
+    df['game_date'] = pd.to_datetime(df['game_date'])
+    # write then rename, so a crash never leaves a half-written day for read_days (or a backfill worker) to find
+    df.to_parquet(path + '.tmp', compression='zstd', index=False)
+    os.replace(path + '.tmp', path)
+
+    return path
+
+
+
+def stored_fingerprints(day, root=STORE_ROOT, window=NEIGHBOUR_DAYS):
+    """This function returns the fingerprints of the pitches stored for the days around day (but not day itself).
+
+    window is how many days either side are checked. Only those partitions' pitch keys are read, so the
+    cost of an ingest doesn't grow with the size of the store.
+    """
+
+    fingerprints = []
+    for offset in range(-window, window + 1):
+        path = partition_path(pd.Timestamp(day) + pd.Timedelta(days=offset), root)
+        if offset == 0 or not os.path.exists(path):
+            continue
+        fingerprints.append(pitch_fingerprints(pd.read_parquet(path, columns=FINGERPRINT_COLUMNS)))
+
+    if not fingerprints:
+        return np.array([], dtype='uint64')
+
+    return np.concatenate(fingerprints)
+
+
+
+def ingest_day(df, day, root=STORE_ROOT):
+    """This function drops pitches already stored under a neighbouring day, then saves the rest as the day's partition.
+
+    Overlapping or repeated fetches can hand back pitches from neighbouring days; those are dropped here
+    (re-saving the same day replaces it, so it isn't checked against itself). Returns the pitches kept.
+    """
+
+    df = drop_duplicate_pitches(df, stored_fingerprints(day, root))[0]
+    write_day(df, day, root)
+
+    return df
+
+
+
+def stored_days(start=None, end=None, root=STORE_ROOT):
+    """This function lists the stored partitions between start and end (inclusive), oldest first."""
+
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+
+    days = []
+    for path in sorted(glob.glob(os.path.join(root, '*', '*.parquet'))):
+        day = pd.Timestamp(os.path.basename(path)[:-len('.parquet')])
+        if start is not None and day < start:
+            continue
+        if end is not None and day > end:
+            continue
+        days.append(path)
+
+    return days
+
+
+
+def read_days(start=None, end=None, columns=None, root=STORE_ROOT):
+    """This function loads stored pitches for a date range.
+
+    start and end bound the dates read (inclusive); leaving either out leaves that side open.
+    columns limits which columns are read off disk.
+    """
+
+    frames = [pd.read_parquet(path, columns=columns) for path in stored_days(start, end, root)]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+
+    # days are concatenated as plain columns, so the lean dtypes are put back on the whole range
+    return apply_schema(pd.concat(frames, ignore_index=True))
+
+
+
+def read_season(season, columns=None, root=STORE_ROOT):
+    return read_days(f"{season}-01-01", f"{season}-12-31", columns=columns, root=root)
@@ -0,0 +1,129 @@
+import pandas as pd
+import os
+import time
+import requests
+
+
+REGISTER_COLUMNS = ['key_mlbam', 'name_first', 'name_last', 'mlb_played_last']
+REGISTER_FILE = os.path.join('data', 'player_register.parquet')
+PEOPLE_URL = 'https://statsapi.mlb.com/api/v1/people'
+# what a download can fail with (an outage, a timeout, an error page); a run carries on without it
+DOWNLOAD_ERRORS = (requests.RequestException, OSError)
+
+
+def chadwick_source():
+    # imported here so a cached run never touches pybaseball
+    from pybaseball import chadwick_register
+    return chadwick_register()
+
+
+
+def read_source(source):
+    if source is None:
+        return chadwick_source()
+    if callable(source):
+        return source()
+    if source.endswith('.parquet'):
+        return pd.read_parquet(source)
+    return pd.read_csv(source)
+
+
+
+def shrink_register(player_data):
+    """This function keeps only the register rows and columns the bot uses."""
+
+    # remove old players to decrease size
+    player_data = player_data[player_data.mlb_played_last>1990]
+    player_data = player_data.dropna(subset=['key_mlbam'])
+    player_data = player_data[REGISTER_COLUMNS].reset_index(drop=True)
+    player_data = player_data.astype({'key_mlbam':'int32', 'mlb_played_last':'int16'})
+
+    return player_data
+
+
+
+def save_register(player_data, cache_file=REGISTER_FILE):
+    folder = os.path.dirname(cache_file)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    player_data.to_parquet(cache_file, index=False)
+
+
+
+def load_player_data(cache_file=REGISTER_FILE, max_age_days=7, source=None):
+    """This function returns the player register, refreshing the local cache only when it is stale.
+
+    cache_file is where the trimmed register is kept between runs.
+    max_age_days controls how old the cache can get before it is downloaded again (None never refreshes).
+    source overrides where a refresh comes from: a function, or a local csv/parquet file.
+    If the refresh can't be downloaded, a stale cache is used as it is (and refreshed on a later run).
+    """
+
+    cached = os.path.exists(cache_file)
+    if cached:
+        age_days = (time.time() - os.path.getmtime(cache_file)) / 86400
+        if max_age_days is None or age_days < max_age_days:
+            return pd.read_parquet(cache_file)
+
+    try:
+        player_data = shrink_register(read_source(source))
+    except DOWNLOAD_ERRORS as error:
+        if not cached:
+            raise
+        print(f"player register refresh failed ({error}), using the cached copy")
+        return pd.read_parquet(cache_file)
+
+    save_register(player_data, cache_file)
+
+    return player_data
+
+
+
+def people_lookup(mlb_IDs):
+    """This function looks up players by MLBAM ID on the MLB stats API."""
+
+    response = requests.get(PEOPLE_URL, params={'personIds': ','.join(str(i) for i in mlb_IDs)}, timeout=30)
+    response.raise_for_status()
+
+    rows = []
+    for person in response.json().get('people', []):
+        rows.append({'key_mlbam': person['id'],
+                     'name_first': person.get('useName', person.get('firstName')),
+                     'name_last': person.get('lastName'),
+                     'mlb_played_last': int(time.strftime('%Y'))})
+
+    return pd.DataFrame(rows, columns=REGISTER_COLUMNS)
+
+
+
+def fetch_missing_players(mlb_IDs, player_data, cache_file=REGISTER_FILE, lookup=people_lookup):
+    """This function adds players that are not in the cached register yet.
+
+    Only IDs missing from player_data are looked up, so a normal day costs at most one small request.
+    lookup takes a list of IDs and returns register rows; it can be swapped out for a local file in tests.
+    If the lookup fails the register is returned as it was, and the missing players show as "Unknown".
+    """
+
+    mlb_IDs = pd.Series(mlb_IDs).dropna().astype('int64').unique()
+    missing = sorted(set(mlb_IDs) - set(player_data['key_mlbam']))
+    if not missing:
+        return player_data
+
+    try:
+        found = lookup(missing)
+    except DOWNLOAD_ERRORS as error:
+        print(f"lookup of {len(missing)} new players failed ({error}), they will show as Unknown")
+        return player_data
+    if len(found)==0:
+        return player_data
+
+    found = found[REGISTER_COLUMNS].astype({'key_mlbam':'int32', 'mlb_played_last':'int16'})
+    player_data = pd.concat([player_data, found], ignore_index=True)
+
+    # keep the old timestamp so topping up the cache doesn't push back the full refresh
+    refreshed = os.path.getmtime(cache_file) if os.path.exists(cache_file) else None
+    save_register(player_data, cache_file)
+    if refreshed is not None:
+        os.utime(cache_file, (refreshed, refreshed))
+
+    return player_data
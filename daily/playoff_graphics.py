@@ -0,0 +1,396 @@
+import os
+import io
+import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from datetime import timedelta
+from PIL import Image, ImageDraw, ImageFont
+
+
+suffix_dict = {
+    1:'st',
+    2:'nd',
+    3:'rd',
+    4:'th',
+    5:'th',
+    6:'th',
+    7:'th',
+    8:'th',
+    9:'th',
+    10:'th',
+    11:'th',
+    12:'th',
+    13:'th',
+    14:'th',
+    15:'th',
+    16:'th',
+    17:'th',
+    18:'th'
+}
+
+team_names_dict = {
+    'NYY':'Yankees',
+    'TOR':'Blue Jays',
+    'TB':'Rays',
+    'BOS':'Red Sox',
+    'BAL':'Orioles',
+    'CLE':'Guardians',
+    'CWS':'White Sox',
+    'MIN':'Twins',
+    'DET':'Tigers',
+    'KC':'Royals',
+    'HOU':'Astros',
+    'SEA':'Mariners',
+    'LAA':'Angels',
+    'OAK':'Athletics',
+    'TEX':'Rangers',
+    'NYM':'Mets',
+    'ATL':'Braves',
+    'PHI':'Phillies',
+    'MIA':'Marlins',
+    'WSH':'Nationals',
+    'STL':'Cardinals',
+    'MIL':'Brewers',
+    'CHC':'Cubs',
+    'PIT':'Pirates',
+    'CIN':'Reds',
+    'LAD':'Dodgers',
+    'SD':'Padres',
+    'SF':'Giants',
+    'ARI':'DBacks',
+    'COL':'Rockies'
+}
+
+
+# fonts and decoded templates, loaded once per process
+font_cache = {}
+template_cache = {}
+
+
+def load_font(path, size):
+    
+    if (path, size) not in font_cache:
+        font_cache[(path, size)] = ImageFont.truetype(path, size)
+    return font_cache[(path, size)]
+
+
+def load_template(path):
+    """This function returns a fresh copy of a template image, decoding the file only the first time."""
+    
+    if path not in template_cache:
+        template = Image.open(path)
+        template.load()
+        template_cache[path] = template
+    return template_cache[path].copy()
+
+
+def get_score_change(game_wp, row):
+    
+    pre_bat = str(game_wp.home_score.iloc[row])
+    if len(pre_bat)==1:
+        pre_bat = "0"+pre_bat
+    pre_bat1 = pre_bat[0]
+    pre_bat2 = pre_bat[1]
+        
+    pre_fld = str(game_wp.away_score.iloc[row])
+    if len(pre_fld)==1:
+        pre_fld = "0"+pre_fld
+    pre_fld1 = pre_fld[0]
+    pre_fld2 = pre_fld[1]
+        
+    post_bat = str(game_wp.post_home_score.iloc[row])
+    if len(post_bat)==1:
+        post_bat = "0"+post_bat
+    post_bat1 = post_bat[0]
+    post_bat2 = post_bat[1]
+        
+    post_fld = str(game_wp.post_away_score.iloc[row])
+    if len(post_fld)==1:
+        post_fld = "0"+post_fld
+    post_fld1 = post_fld[0]
+    post_fld2 = post_fld[1]
+    
+    # text = f"{pre_bat}-{pre_fld}»{post_bat}-{post_fld}"
+    
+    return (pre_bat1, pre_bat2, pre_fld1, pre_fld2, post_bat1, post_bat2, post_fld1, post_fld2)
+
+
+# # Win Probability Card Layout
+
+# colors and fonts used on the cards
+colors = {
+    'gold': (255, 192, 0),
+    'white': (255, 255, 255)
+}
+
+card_fonts = {
+    'team_date': ('graphics\\fonts\\OpenSans-Bold.ttf', 50),
+    'date': ('graphics\\fonts\\OpenSans-Bold.ttf', 30),
+    'player_1': ('graphics\\fonts\\OpenSans-Bold.ttf', 45),
+    'player_23': ('graphics\\fonts\\OpenSans-Bold.ttf', 40),
+    'outcome': ('graphics\\fonts\\OpenSans-Bold.ttf', 35),
+    'percentage_1': ('graphics\\fonts\\ChunkFivePrint.otf', 100),
+    'percentage_23': ('graphics\\fonts\\ChunkFivePrint.otf', 60),
+    'percent': ('graphics\\fonts\\OpenSans-Bold.ttf', 30),
+    'series_game': ('graphics\\fonts\\Furore.otf', 70),
+    'score': ('graphics\\fonts\\digital-7(mono).ttf', 40),
+    'scoreboard_team': ('graphics\\fonts\\OpenSans-Bold.ttf', 18)
+}
+
+# each slot is (text, xy, font, color, anchor); text is formatted with the card's fields
+
+# drawn once per home/away pair: scoreboard team abbreviations and percent signs
+win_prob_static_slots = [
+    ("{home_team}", (253, 479), 'scoreboard_team', 'gold', 'ma'),
+    ("{home_team}", (156, 698), 'scoreboard_team', 'gold', 'ma'),
+    ("{home_team}", (156, 916), 'scoreboard_team', 'gold', 'ma'),
+    ("{home_team}", (429, 479), 'scoreboard_team', 'gold', 'ma'),
+    ("{home_team}", (333, 698), 'scoreboard_team', 'gold', 'ma'),
+    ("{home_team}", (333, 916), 'scoreboard_team', 'gold', 'ma'),
+    ("{away_team}", (312, 479), 'scoreboard_team', 'gold', 'ma'),
+    ("{away_team}", (215, 698), 'scoreboard_team', 'gold', 'ma'),
+    ("{away_team}", (215, 916), 'scoreboard_team', 'gold', 'ma'),
+    ("{away_team}", (488, 479), 'scoreboard_team', 'gold', 'ma'),
+    ("{away_team}", (392, 698), 'scoreboard_team', 'gold', 'ma'),
+    ("{away_team}", (392, 916), 'scoreboard_team', 'gold', 'ma'),
+    ("%", (870, 399), 'percent', 'gold', None),
+    ("%", (660, 630), 'percent', 'white', None),
+    ("%", (660, 846), 'percent', 'white', None)
+]
+
+# drawn on every card
+win_prob_slots = [
+    # PLAYER NAMES
+    ("{game_date}", (930-20, 20), 'date', 'white', 'rt'),
+    ("{player_1}", (202, 355), 'player_1', 'gold', None),
+    ("{player_2}", (105, 587), 'player_23', 'white', None),
+    ("{player_3}", (105, 804), 'player_23', 'white', None),
+    # EVENT and INNING
+    ("{event_1} ({topbot_1} {inning_1}{inning_1_suffix})", (220, 415), 'outcome', 'white', None),
+    ("{event_2} ({topbot_2} {inning_2}{inning_2_suffix})", (125, 640), 'outcome', 'white', None),
+    ("{event_3} ({topbot_3} {inning_3}{inning_3_suffix})", (125, 857), 'outcome', 'white', None),
+    # PROBABILITIES
+    ("{pct_1}", (865, 357), 'percentage_1', 'gold', 'ra'),
+    ("{pct_2}", (655, 618), 'percentage_23', 'white', 'ra'),
+    ("{pct_3}", (655, 835), 'percentage_23', 'white', 'ra')
+]
+
+# SCORES: one digit per slot, pre/post score for the batting and fielding side of each moment
+score_digits = ['pre_bat1', 'pre_bat2', 'pre_fld1', 'pre_fld2', 'post_bat1', 'post_bat2', 'post_fld1', 'post_fld2']
+score_rows = [
+    (1, [232, 255, 291, 314, 409, 433, 467, 490], 508),
+    (2, [136, 159, 195, 218, 313, 337, 372, 395], 727),
+    (3, [136, 159, 195, 218, 313, 337, 372, 395], 945)
+]
+for row, xs, y in score_rows:
+    for digit, x in zip(score_digits, xs):
+        win_prob_slots.append((f"{{{digit}_{row}}}", (x, y), 'score', 'white', None))
+
+
+# text widths, measured once per text and font
+text_lengths = {}
+static_layers = {}
+
+
+def text_length(text, font):
+    
+    if (text, font) not in text_lengths:
+        text_lengths[(text, font)] = ImageDraw.Draw(Image.new('RGB', (1, 1))).textlength(text=text, font=load_font(*card_fonts[font]))
+    return text_lengths[(text, font)]
+
+
+def draw_slots(img, slots, fields):
+    """This function draws a batch of layout slots onto an image with a single ImageDraw."""
+    
+    d1 = ImageDraw.Draw(img)
+    for text, xy, font, color, anchor in slots:
+        d1.text(xy, text.format(**fields), font=load_font(*card_fonts[font]), fill=colors[color], anchor=anchor)
+
+
+def static_layer(template, slots, fields, key):
+    """This function returns a copy of the template with its static slots drawn, rendering each key only once."""
+    
+    if (template, key) not in static_layers:
+        img = load_template(template)
+        draw_slots(img, slots, fields)
+        static_layers[(template, key)] = img
+    return static_layers[(template, key)].copy()
+
+
+def header_slots(fields, away_team, home_team, winner, home_final, away_final):
+    
+    # the winner is gold, so the header is split into two texts
+    if winner==team_names_dict[home_team]:
+        fields['header_1'] = f"{team_names_dict[away_team]} ({away_final}) @ "
+        fields['header_2'] = f"{winner} ({home_final})"
+        header_colors = ('white', 'gold')
+    else:
+        fields['header_1'] = f"{winner} ({away_final}) "
+        fields['header_2'] = f"@ {team_names_dict[home_team]} ({home_final})"
+        header_colors = ('gold', 'white')
+    
+    length = text_length(fields['header_1'], 'team_date')
+    return [("{header_1}", (55, 30), 'team_date', header_colors[0], None),
+            ("{header_2}", (55+length, 30), 'team_date', header_colors[1], None)]
+
+
+def stacked_slots(fields, name, text, x, start_y, step, font, color, highlight=None):
+    
+    # one character per slot, stacked down the card
+    slots = list()
+    for count, char in enumerate(text, start=1):
+        fields[f"{name}_{count}"] = char
+        slots.append((f"{{{name}_{count}}}", (x, start_y), font, 'gold' if count==highlight else color, 'ma'))
+        start_y += step
+    return slots
+
+
+def format_event(event):
+    return event.replace('_', ' ').title().replace('Grounded Into ','').upper().replace('FIELDERS CHOICE', 'FC').replace('HIT BY PITCH', 'HBP').replace('STRIKEOUT DOUBLE PLAY', 'DOUBLE PLAY').title().replace('Hbp', 'HBP')
+
+
+def win_prob_fields(game_wp, away_team, home_team):
+    """This function pulls every value the win probability card shows out of the game's win_prob_v2 result."""
+    
+    fields = {
+        'home_team': home_team,
+        'away_team': away_team,
+        'game_date': game_wp['game_date'].iloc[0].strftime('%#m/%#d/%y')
+    }
+    
+    for row in range(3):
+        num = row + 1
+        inning = game_wp['inning'].iloc[row]
+        fields[f"player_{num}"] = game_wp['batter_name'].iloc[row]
+        fields[f"event_{num}"] = format_event(game_wp['events'].iloc[row])
+        fields[f"pct_{num}"] = game_wp['batter_win_pct_str'].iloc[row]
+        fields[f"inning_{num}"] = inning
+        fields[f"inning_{num}_suffix"] = suffix_dict[inning]
+        fields[f"topbot_{num}"] = game_wp['inning_topbot'].iloc[row]
+        for digit, value in zip(score_digits, get_score_change(game_wp, row)):
+            fields[f"{digit}_{num}"] = value
+    
+    return fields
+
+
+def create_graphic(game_wp, away_team, home_team, winner, home_final, away_final, series, game_num):
+    
+    fields = win_prob_fields(game_wp, away_team, home_team)
+    
+    # start from the template with this matchup's static slots already drawn
+    img = static_layer('graphics\\graphicTemplate.png', win_prob_static_slots, fields, (home_team, away_team))
+    
+    slots = header_slots(fields, away_team, home_team, winner, home_final, away_final) + win_prob_slots
+    if series=='WS':
+        slots += stacked_slots(fields, 'series', series, 765, 750, 90, 'series_game', 'white')
+    else:
+        slots += stacked_slots(fields, 'series', series, 765, 675, 80, 'series_game', 'white')
+    slots += stacked_slots(fields, 'game_num', game_num, 845, 675, 60, 'series_game', 'white', highlight=5)
+    
+    draw_slots(img, slots, fields)
+    
+    return img
+
+
+# # Saving Graphics
+
+# encoder settings per output format: (file extension, PIL save arguments)
+# lossless webp is about 40% the size of the png for a similar encode time
+image_formats = {
+    'png': ('.png', {'format': 'PNG'}),
+    'png_optimized': ('.png', {'format': 'PNG', 'optimize': True}),
+    'webp': ('.webp', {'format': 'WEBP', 'lossless': True, 'method': 4})
+}
+
+
+def encode_image(img, image_format='png'):
+    
+    buffer = io.BytesIO()
+    img.save(buffer, **image_formats[image_format][1])
+    return buffer.getvalue()
+
+
+def graphic_file(name, image_format='png'):
+    return name + image_formats[image_format][0]
+
+
+def card_name(home_team, away_team):
+    return f"{((date.today() - timedelta(days=1)).strftime('%#m/%#d/%y')).replace('/','-')}_{home_team}-{away_team}"
+
+
+# sinks take a file name and the encoded bytes
+
+def directory_sink(folder):
+    
+    def write(name, data):
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, name), 'wb') as f:
+            f.write(data)
+    return write
+
+
+def memory_sink(store):
+    """This function keeps encoded graphics in a dict (name -> bytes), ready to hand to a media upload."""
+    
+    def write(name, data):
+        store[name] = data
+    return write
+
+
+def zip_sink(path):
+    """This function writes encoded graphics into a zip archive at path.
+    
+    Each sink starts a new, empty archive, so rendering again replaces the cards rather than adding copies.
+    """
+    
+    with zipfile.ZipFile(path, 'w'):
+        pass
+    
+    def write(name, data):
+        with zipfile.ZipFile(path, 'a', compression=zipfile.ZIP_STORED) as archive:
+            archive.writestr(name, data)
+    return write
+
+
+def save_graphic(img, name, sink, image_format='png'):
+    
+    file_name = graphic_file(name, image_format)
+    sink(file_name, encode_image(img, image_format))
+    return file_name
+
+
+def render_job(job, image_format='png'):
+    """This function renders and encodes one card from a job dict (the keyword arguments of create_graphic).
+    
+    Returns the card's file name and its encoded bytes.
+    """
+    
+    img = create_graphic(**job)
+    name = graphic_file(card_name(job['home_team'], job['away_team']), image_format)
+    return (name, encode_image(img, image_format))
+    
+    
+def render_graphics(jobs, sink, workers=1, image_format='png'):
+    """This function renders a list of card jobs and writes them to a sink, in a process pool when workers is more than 1.
+    
+    Each job is a plain dict of create_graphic arguments, so it pickles cheaply and every card
+    comes out exactly as it would serially. Workers only render and encode; the sink is written
+    from this process, so in-memory and zip sinks work in both modes. The pool forks from the
+    running script, so platforms without fork (Windows) render serially rather than re-running
+    the whole script in each worker. Returns the file names written, in job order.
+    """
+    
+    if workers is None:
+        workers = os.cpu_count()
+    
+    if workers <= 1 or len(jobs) <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        cards = [render_job(job, image_format) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=multiprocessing.get_context('fork')) as pool:
+            cards = list(pool.map(render_job, jobs, [image_format]*len(jobs)))
+    
+    for name, data in cards:
+        sink(name, data)
+    
+    return [name for name, data in cards]
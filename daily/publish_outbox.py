@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Sends whatever the daily, weekly and playoff scripts queued but didn't get out
+# (e.g. after a crash or an API outage), without downloading or cleaning anything again.
+
+import os
+import tweepy
+import requests
+from tweet_publisher import upload_media
+from tweet_outbox import drain_outbox
+import statcast_secrets
+
+
+# post each batch as a thread (the first tweet queued leads it)
+thread_tweets = True
+# each tweet in a thread replies to the one before it, so the thread reads in queue order
+chain_tweets = True
+# attach queued graphics from this folder (media upload needs elevated API access)
+upload_graphics = False
+graphics_folder = os.path.join('graphics', 'created_graphics', '2022')
+
+
+# # Publish Tweets
+
+client = tweepy.Client(
+    bearer_token=statcast_secrets.bearer_token,
+    consumer_key=statcast_secrets.api_key,
+    consumer_secret=statcast_secrets.api_key_secret,
+    access_token=statcast_secrets.access_token,
+    access_token_secret=statcast_secrets.access_token_secret,
+    return_type = requests.Response,
+    wait_on_rate_limit=False
+)
+
+upload = None
+if upload_graphics:
+    auth = tweepy.OAuthHandler(consumer_key=statcast_secrets.api_key, consumer_secret=statcast_secrets.api_key_secret)
+    auth.set_access_token(key=statcast_secrets.access_token, secret=statcast_secrets.access_token_secret)
+    upload = upload_media(tweepy.API(auth), graphics_folder)
+
+sent, failed = drain_outbox(client, upload=upload, thread=thread_tweets, chain=chain_tweets)
+print(f"Sent {sent} tweets, {failed} failed")
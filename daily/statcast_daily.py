@@ -5,6 +5,9 @@
 
 from pybaseball import *
 from daily_functions import *
+from player_registry import load_player_data, fetch_missing_players
+from pitch_store import ingest_day
+from statcast_fetch import fetch_day
 import pandas as pd
 import numpy as np
 import math
@@ -16,21 +19,23 @@ from datetime import timedelta
 import tweepy
 from pandas.io.json import json_normalize
 import requests
+from tweet_outbox import enqueue_tweets, outbox_key, drain_outbox
 import statcast_secrets
 
 
 # # Import Data
 
-# import player data
-player_data = chadwick_register()
-# remove old players to decrease size
-player_data = player_data[player_data.mlb_played_last>1990]
+# import player data (cached locally, refreshed weekly)
+player_data = load_player_data()
 
 # find yesterday's date
 yesterday = (date.today() - timedelta(days=1)).strftime("%Y-%m-%d")
 
-# download statcast data
-data = statcast(start_dt=yesterday)
+# download statcast data (cached by day, so reruns and the other daily script don't download it again)
+data = fetch_day(yesterday)
+
+# look up anyone who isn't in the cached register yet
+player_data = fetch_missing_players(pd.concat([data['batter'], data['pitcher']]), player_data)
 
 
 # # Clean Data and Save File
@@ -38,27 +43,17 @@ data = statcast(start_dt=yesterday)
 # run function to add player names & teams
 df = clean_data(data, player_data)
 
-# save data in file system
-yesterday_file = f"{yesterday}.csv"
-df.to_csv(os.path.join('C:\\', 'Users', 'Owner', 'Documents', 'Moneyball', 'statcast',
-                       'daily', 'daily_data_v2', yesterday_file))
+# save data in file system (season/date parquet partition under STATCAST_STORE), dropping pitches already stored under other days
+df = ingest_day(df, yesterday)
 
 
 # # Run Daily Functions
 
-# homer distances
-homer_distance_high = homer_distance(df)
-homer_distance_low = homer_distance(df, bottom=True)
-# pitch speeds
-pitch_speed_high = pitch_speed(df)
-pitch_speed_low = pitch_speed(df, bottom=True)
-# launch speeds
-launch_speed_high = launch_speed(df, only_events=True)
-launch_speed_low = launch_speed(df, bottom=True, only_events=True)
-# long plate appearances
-pitches_seen_atbat_high = pitches_seen(df, atbat=True)
-# win prob changes
-win_prob_high = win_prob(df)
+# every category in one pass over the day (see DAILY_CATEGORIES)
+results, timings = leaderboards(df)
+
+for category, seconds in timings.items():
+    print(f"{category}: {seconds:.3f}s")
 
 
 # # Create Tweets
@@ -99,27 +94,8 @@ socials = {
 
 # Create Tweets
 
-# homer tweets
-homer_high_tweet = create_homer_high_tweet(homer_distance_high, socials)
-homer_low_tweet = create_homer_low_tweet(homer_distance_low, socials)
-
-# pitch tweets
-pitch_high_tweet = create_pitch_high_tweet(pitch_speed_high, socials)
-pitch_low_tweet = create_pitch_low_tweet(pitch_speed_low, socials)
-
-# exit velocity tweets
-ev_high_tweet = create_ev_high_tweet(launch_speed_high, socials)
-ev_low_tweet = create_ev_low_tweet(launch_speed_low, socials)
-
-# long PA tweet
-atbat_long_tweet = create_atbat_long_tweet(pitches_seen_atbat_high, socials)
-
-# win prob tweet
-win_prob_tweet = create_win_prob_tweet(win_prob_high, socials)
-
-# put tweets into list
-tweets = [homer_high_tweet, homer_low_tweet, pitch_high_tweet, pitch_low_tweet,
-          ev_high_tweet, ev_low_tweet, atbat_long_tweet, win_prob_tweet]
+# one tweet per leaderboard, written up from TWEET_CATEGORIES
+tweets = create_tweets(results, socials)
 
 
 # Preview Tweets
@@ -140,17 +116,25 @@ client = tweepy.Client(
     access_token=statcast_secrets.access_token, 
     access_token_secret=statcast_secrets.access_token_secret, 
     return_type = requests.Response,
-    wait_on_rate_limit=True
+    wait_on_rate_limit=False
 )
 
 
-# Send Tweets
+# Queue Tweets
 
-for tweet in tweets:
-    try:
-        client.create_tweet(text=tweet)
-    except:
-        client.create_tweet(text=tweet[:270])
+# each tweet is keyed by day and category, so a rerun never queues (or posts) the same tweet twice
+categories = [category['name'] for category in DAILY_CATEGORIES]
+enqueue_tweets(f"daily/{yesterday}", [(outbox_key(yesterday, category), tweet) for category, tweet in zip(categories, tweets)])
 
 
+# Send Tweets
+
+# posts are throttled by tweet_publisher.py, so tweepy doesn't sleep on its own
+# thread_tweets posts the first leaderboard and the rest as replies to it, instead of separate posts
+# only this run's tweets are sent here; anything that fails stays in the outbox for publish_outbox.py to retry
+thread_tweets = True
+# chain_tweets makes each leaderboard reply to the one before it, so the thread reads in order
+chain_tweets = True
 
+sent, failed = drain_outbox(client, thread=thread_tweets, chain=chain_tweets, batch=f"daily/{yesterday}")
+print(f"Sent {sent} tweets, {failed} failed")
@@ -0,0 +1,87 @@
+import pandas as pd
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+# raw Statcast responses, laid out as {root}/v{SCHEMA_VERSION}/{season}/{YYYY-MM-DD}.parquet
+CACHE_ROOT = os.environ.get('STATCAST_CACHE', os.path.join('data', 'statcast_cache'))
+# bump when the columns pulled from Statcast (or how they are parsed) change, so old responses aren't reused
+SCHEMA_VERSION = 1
+
+
+def statcast_source(day):
+    # imported here so a cache hit never touches pybaseball
+    from pybaseball import statcast
+    return statcast(start_dt=day, end_dt=day)
+
+
+
+def cache_path(day, root=CACHE_ROOT, version=SCHEMA_VERSION):
+    day = pd.Timestamp(day).strftime('%Y-%m-%d')
+    return os.path.join(root, f"v{version}", day[:4], f"{day}.parquet")
+
+
+
+def fetch_day(day, source=statcast_source, root=CACHE_ROOT, refresh=False):
+    """This function returns one day of raw Statcast data, downloading it only if it isn't cached yet.
+
+    source is the function that downloads a day given 'YYYY-MM-DD'.
+    refresh downloads the day again and replaces the cached copy (e.g. if it was cached before the day ended).
+    """
+
+    day = pd.Timestamp(day).strftime('%Y-%m-%d')
+    path = cache_path(day, root)
+    if os.path.exists(path) and not refresh:
+        return pd.read_parquet(path)
+
+    data = source(day)
+    if len(data) == 0:
+        # an empty day may just not be published yet, so it is asked for again next time
+        return data
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # write then rename, so an interrupted write never leaves a half day in the cache
+    data.to_parquet(path + '.tmp', index=False)
+    os.replace(path + '.tmp', path)
+
+    return data
+
+
+
+def fetch_range(start, end, source=statcast_source, root=CACHE_ROOT, workers=4):
+    """This function returns the raw Statcast data for start to end (inclusive), one cached day at a time.
+
+    Days missing from the cache are downloaded in parallel, workers at a time.
+    """
+
+    days = [day.strftime('%Y-%m-%d') for day in pd.date_range(start, end)]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(lambda day: fetch_day(day, source, root), days))
+
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return pd.DataFrame()
+
+    return pd.concat(frames, ignore_index=True)
+
+
+
+def seed_cache(folder, root=CACHE_ROOT):
+    """This function copies fixture files named {YYYY-MM-DD}.parquet (or .csv) from folder into the cache.
+
+    Returns the days seeded.
+    """
+
+    days = []
+    for file in sorted(os.listdir(folder)):
+        day, ext = os.path.splitext(file)
+        if ext not in ['.parquet', '.csv']:
+            continue
+
+        path = os.path.join(folder, file)
+        data = pd.read_parquet(path) if ext == '.parquet' else pd.read_csv(path)
+        fetch_day(day, source=lambda day: data, root=root, refresh=True)
+        days.append(day)
+
+    return days
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# # Import Libraries
+
+from daily_functions import *
+from pitch_store import read_days
+import pandas as pd
+from datetime import date
+from datetime import timedelta
+import tweepy
+import requests
+from tweet_outbox import enqueue_tweets, outbox_key, drain_outbox
+import statcast_secrets
+
+
+# # Import Data
+
+# the past week runs Monday through yesterday (Sunday)
+week_end = date.today() - timedelta(days=1)
+week_start = week_end - timedelta(days=6)
+
+# only the columns the leaderboards below read
+columns = ['batter_name', 'batter_team', 'pitcher_name', 'pitcher_team', 'game_date', 'game_pk',
+           'inning', 'outs_when_up', 'events', 'description', 'pitch_type', 'release_speed',
+           'launch_speed', 'launch_angle', 'hit_distance_sc', 'delta_home_win_exp']
+
+# load the already-cleaned days saved by statcast_daily.py (no download or re-cleaning)
+df = read_days(week_start, week_end, columns=columns)
+
+
+# # Run Daily Functions
+
+# every category in one pass over the day (see DAILY_CATEGORIES)
+results, timings = leaderboards(df)
+
+for category, seconds in timings.items():
+    print(f"{category}: {seconds:.3f}s")
+
+
+# # Create Tweets
+
+socials = {
+    'BAL': {'at':'@Orioles',      'hashtag':'#Birdland'},
+    'BOS': {'at':'@RedSox',       'hashtag':'#DirtyWater'},
+    'NYY': {'at':'@Yankees',      'hashtag':'#RepBX'},
+    'TB':  {'at':'@RaysBaseball', 'hashtag':'#RaysUp'},
+    'TOR': {'at':'@BlueJays',     'hashtag':'#NextLevel'},
+    'CWS': {'at':'@whitesox',     'hashtag':'#ChangeTheGame'},
+    'CLE': {'at':'@CleGuardians', 'hashtag':'#ForTheLand'},
+    'DET': {'at':'@tigers',       'hashtag':'#DetroitRoots'},
+    'KC':  {'at':'@Royals',       'hashtag':'#TogetherRoyal'},
+    'MIN': {'at':'@Twins',        'hashtag':'#MNTwins'},
+    'HOU': {'at':'@astros',       'hashtag':'#LevelUp'},
+    'LAA': {'at':'@Angels',       'hashtag':'#GoHalos'},
+    'OAK': {'at':'@Athletics',    'hashtag':'#DrumTogether'},
+    'SEA': {'at':'@Mariners',     'hashtag':'#SeaUsRise'},
+    'TEX': {'at':'@Rangers',      'hashtag':'#StraightUpTX'},
+    'ATL': {'at':'@Braves',       'hashtag':'#ForTheA'},
+    'MIA': {'at':'@Marlins',      'hashtag':'#MakeItMiami'},
+    'NYM': {'at':'@Mets',         'hashtag':'#LGM'},
+    'PHI': {'at':'@Phillies',     'hashtag':'#RingTheBell'},
+    'WSH': {'at':'@Nationals',    'hashtag':'#Natitude'},
+    'CHC': {'at':'@Cubs',         'hashtag':'#ItsDifferentHere'},
+    'CIN': {'at':'@Reds',         'hashtag':'#ATOBTTR'},
+    'MIL': {'at':'@Brewers',      'hashtag':'#ThisIsMyCrew'},
+    'PIT': {'at':'@Pirates',      'hashtag':'#LetsGoBucs'},
+    'STL': {'at':'@Cardinals',    'hashtag':'#STLCards'},
+    'ARI': {'at':'@Dbacks',       'hashtag':'#Dbacks'},
+    'COL': {'at':'@Rockies',      'hashtag':'#Rockies'},
+    'LAD': {'at':'@Dodgers',      'hashtag':'#AlwaysLA'},
+    'SD':  {'at':'@Padres',       'hashtag':'#TimeToShine'},
+    'SF':  {'at':'@SFGiants',     'hashtag':'#SFGameUp'}
+}
+
+
+# Create Tweets
+
+week_str = f"{week_start.strftime('%#m/%#d/%y')} - {week_end.strftime('%#m/%#d/%y')}"
+
+# one tweet per leaderboard, written up from TWEET_CATEGORIES
+tweets = create_tweets(results, socials, week_str)
+
+
+# Preview Tweets
+
+for tweet in tweets:
+    print(tweet)
+    print('\n')
+
+
+# # Publish Tweets
+
+# Create Twitter Client
+
+client = tweepy.Client(
+    bearer_token=statcast_secrets.bearer_token, 
+    consumer_key=statcast_secrets.api_key, 
+    consumer_secret=statcast_secrets.api_key_secret, 
+    access_token=statcast_secrets.access_token, 
+    access_token_secret=statcast_secrets.access_token_secret, 
+    return_type = requests.Response,
+    wait_on_rate_limit=False
+)
+
+
+# Queue Tweets
+
+# each tweet is keyed by week and category, so a rerun never queues (or posts) the same tweet twice
+categories = [category['name'] for category in DAILY_CATEGORIES]
+enqueue_tweets(f"weekly/{week_end}", [(outbox_key(week_end, f"weekly_{category}"), tweet) for category, tweet in zip(categories, tweets)])
+
+
+# Send Tweets
+
+# posts are throttled by tweet_publisher.py, so tweepy doesn't sleep on its own
+# thread_tweets posts the first leaderboard and the rest as replies to it, instead of separate posts
+# only this run's tweets are sent here; anything that fails stays in the outbox for publish_outbox.py to retry
+thread_tweets = True
+# chain_tweets makes each leaderboard reply to the one before it, so the thread reads in order
+chain_tweets = True
+
+sent, failed = drain_outbox(client, thread=thread_tweets, chain=chain_tweets, batch=f"weekly/{week_end}")
+print(f"Sent {sent} tweets, {failed} failed")
@@ -0,0 +1,204 @@
+import os
+import time
+import uuid
+import sqlite3
+from tweet_publisher import TokenBucket, publish_tweets, publish_thread, tweet_id
+
+
+# generated tweets wait here until the publisher step sends them
+OUTBOX_FILE = os.environ.get('STATCAST_OUTBOX', os.path.join('data', 'outbox.sqlite'))
+# a drain holds its claim on the tweets it is posting; a claim older than this is from a run that died
+CLAIM_TIMEOUT = 60 * 60
+
+
+def open_outbox(path=OUTBOX_FILE):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            key TEXT UNIQUE NOT NULL,
+            batch TEXT NOT NULL,
+            text TEXT NOT NULL,
+            media TEXT,
+            created REAL NOT NULL,
+            sent REAL,
+            tweet_id TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            claim TEXT,
+            claimed REAL
+        )""")
+    # outboxes made before drains claimed their tweets
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(outbox)")]
+    for column, kind in [('claim', 'TEXT'), ('claimed', 'REAL')]:
+        if column not in columns:
+            conn.execute(f"ALTER TABLE outbox ADD COLUMN {column} {kind}")
+    conn.commit()
+
+    return conn
+
+
+
+def outbox_key(day, category, game=None):
+    """This function builds the idempotency key for one tweet, e.g. 2022-10-05/homer_distance_high."""
+
+    key = f"{day}/{category}"
+    if game is not None:
+        key += f"/{game}"
+    return key
+
+
+
+def enqueue(conn, batch, key, text, media=None):
+    """This function adds a tweet (and optional media file) to the outbox.
+
+    Tweets are grouped into batches (one per script run, e.g. daily/2022-10-05) that post together.
+    A key that is already queued is left as it was, so rerunning the generation step never posts twice.
+    Returns True if the tweet was added.
+    """
+
+    cursor = conn.execute("INSERT OR IGNORE INTO outbox (key, batch, text, media, created) VALUES (?, ?, ?, ?, ?)",
+                          (key, batch, text, media, time.time()))
+    conn.commit()
+
+    return cursor.rowcount == 1
+
+
+
+def enqueue_tweets(batch, keyed_tweets, path=OUTBOX_FILE):
+    """This function queues a list of (key, tweet) pairs, where tweet is text or [text, media_file]."""
+
+    conn = open_outbox(path)
+    added = 0
+    for key, tweet in keyed_tweets:
+        text, media = tweet if isinstance(tweet, (list, tuple)) else (tweet, None)
+        added += enqueue(conn, batch, key, text, media)
+    conn.close()
+
+    return added
+
+
+
+def claim_pending(conn, batch=None, timeout=CLAIM_TIMEOUT):
+    """This function claims the unsent tweets (of one batch, or all) that no other drain is posting.
+
+    The claim is taken in one write transaction, so two drains running at once never get the same tweet.
+    Returns the claim token and the claimed tweets (oldest first) as dicts.
+    """
+
+    token = uuid.uuid4().hex
+    now = time.time()
+    query = "UPDATE outbox SET claim = ?, claimed = ? WHERE sent IS NULL AND (claim IS NULL OR claimed < ?)"
+    params = (token, now, now - timeout)
+    if batch is not None:
+        query += " AND batch = ?"
+        params += (batch,)
+
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute(query, params)
+    conn.commit()
+
+    rows = conn.execute("SELECT id, key, batch, text, media, attempts FROM outbox WHERE claim = ? ORDER BY id",
+                        (token,)).fetchall()
+    return token, [dict(zip(['id', 'key', 'batch', 'text', 'media', 'attempts'], row)) for row in rows]
+
+
+
+def release(conn, token):
+    """This function hands back whatever a drain claimed, so anything left unsent is picked up by the next run."""
+
+    conn.execute("UPDATE outbox SET claim = NULL, claimed = NULL WHERE claim = ?", (token,))
+    conn.commit()
+
+
+
+def mark_sent(conn, key, new_id):
+    conn.execute("UPDATE outbox SET sent = ?, tweet_id = ?, error = NULL WHERE key = ?", (time.time(), new_id, key))
+    conn.commit()
+
+
+
+def mark_failed(conn, key, error):
+    conn.execute("UPDATE outbox SET attempts = attempts + 1, error = ? WHERE key = ?", (str(error), key))
+    conn.commit()
+
+
+
+def thread_root(conn, batch):
+    """This function returns the first tweet queued for a batch as (key, tweet_id); tweet_id is None until it is sent."""
+
+    return conn.execute("SELECT key, tweet_id FROM outbox WHERE batch = ? ORDER BY id LIMIT 1", (batch,)).fetchone()
+
+
+
+def thread_last(conn, batch):
+    """This function returns the tweet_id of the latest tweet in a batch (in queue order) that went out, or None."""
+
+    row = conn.execute("SELECT tweet_id FROM outbox WHERE batch = ? AND tweet_id IS NOT NULL ORDER BY id DESC LIMIT 1",
+                       (batch,)).fetchone()
+    return row[0] if row is not None else None
+
+
+
+def drain_outbox(client, path=OUTBOX_FILE, upload=None, thread=False, chain=False, workers=4, bucket=None, batch=None,
+                 sleep=time.sleep):
+    """This function posts everything still unsent in the outbox (or in one batch) and marks each tweet as sent once it goes out.
+
+    Tweets are claimed before they are posted, so drains that overlap (e.g. the daily script and
+    publish_outbox.py) never post the same tweet twice.
+
+    Batches drain oldest first; within a batch the tweets post concurrently (see publish_tweets), with any
+    media uploading ahead of them when upload is given.
+    thread=True posts each batch as a thread (see publish_thread): the batch's first tweet goes out first and the
+    rest reply to it, including on a later run after the first tweet already went out.
+    chain=True (with thread) makes each tweet reply to the one before it in queue order, so the thread reads in
+    order; a later run carries on from the last tweet of the batch that went out.
+    sleep is what retries back off with (swapped out in tests).
+    Returns the number of tweets sent and the number that failed (those stay queued for the next run).
+    """
+
+    if bucket is None:
+        bucket = TokenBucket(sleep=sleep)
+
+    conn = open_outbox(path)
+    sent, failed = 0, 0
+
+    token, items = claim_pending(conn, batch)
+    batches = list(dict.fromkeys(item['batch'] for item in items))
+
+    try:
+        for batch in batches:
+            batch_items = [item for item in items if item['batch'] == batch]
+            # queued graphics are only attached when there is a way to upload them
+            tweets = [[item['text'], item['media'] if upload is not None else None] for item in batch_items]
+
+            # each tweet is marked as soon as it goes out, so a crash part way through loses nothing
+            def done(i, result):
+                nonlocal sent, failed
+                if isinstance(result, Exception):
+                    mark_failed(conn, batch_items[i]['key'], result)
+                    failed += 1
+                else:
+                    mark_sent(conn, batch_items[i]['key'], tweet_id(result))
+                    sent += 1
+
+            if thread:
+                root_key, reply_to = thread_root(conn, batch)
+                if reply_to is None and batch_items[0]['key'] != root_key:
+                    # another drain is posting the first tweet, so the replies wait for a later run
+                    continue
+                if chain and reply_to is not None:
+                    reply_to = thread_last(conn, batch)
+                results = publish_thread(client, tweets, upload, workers, bucket, chain, reply_to, done, sleep=sleep)
+                # replies wait for the first tweet, so if it failed the whole batch is retried next run
+                failed += sum(result is None for result in results)
+            else:
+                publish_tweets(client, tweets, upload, workers, bucket, done=done, sleep=sleep)
+    finally:
+        release(conn, token)
+
+    conn.close()
+
+    return sent, failed
@@ -0,0 +1,265 @@
+import os
+import time
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+# posting limit for the v2 create tweet endpoint (per user): 200 tweets per 15 minutes
+TWEET_RATE = 200 / (15 * 60)
+TWEET_BURST = 5
+TWEET_MAX_LENGTH = 280
+
+
+class TokenBucket:
+    """Hands out one token per post, refilled at a steady rate and corrected by the API's rate-limit headers.
+
+    rate is tokens per second and capacity is the largest burst allowed.
+    clock and sleep can be swapped out to test throttling without waiting.
+    """
+
+    def __init__(self, rate=TWEET_RATE, capacity=TWEET_BURST, clock=time.time, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.blocked_until = 0
+        self.lock = threading.Lock()
+
+    def refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return now
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = self.refill()
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+    def update(self, headers):
+        """This function applies x-rate-limit-remaining/x-rate-limit-reset from a response."""
+
+        remaining = headers.get('x-rate-limit-remaining')
+        reset = headers.get('x-rate-limit-reset')
+        if remaining is None:
+            return
+
+        with self.lock:
+            self.refill()
+            self.tokens = min(self.tokens, int(remaining))
+            if int(remaining) == 0 and reset is not None:
+                self.blocked_until = max(self.blocked_until, float(reset))
+
+
+
+def error_status(error):
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+
+def error_kind(error):
+    """This function sorts a failed post into 'too_long', 'rate_limited', 'transient' or 'permanent'."""
+
+    status = error_status(error)
+    if status == 400 and 'too long' in str(error).lower():
+        return 'too_long'
+    if status == 429:
+        return 'rate_limited'
+    # server errors and dropped or timed-out connections are worth another try; anything else (a bad request,
+    # or a bug raising TypeError/KeyError) would fail the same way again
+    if status is not None and status >= 500:
+        return 'transient'
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return 'transient'
+    return 'permanent'
+
+
+
+def post_tweet(client, text, bucket, max_retries=3, backoff=2.0, sleep=time.sleep, **kwargs):
+    """This function posts one tweet, retrying transient failures with exponential backoff.
+
+    A "too long" error is not retried as-is; the text is cut to fit once and posted again.
+    kwargs go straight to client.create_tweet (e.g. in_reply_to_tweet_id).
+    """
+
+    attempt = 0
+    while True:
+        bucket.acquire()
+        try:
+            response = client.create_tweet(text=text, **kwargs)
+        except Exception as error:
+            kind = error_kind(error)
+            response = getattr(error, 'response', None)
+            if response is not None:
+                bucket.update(response.headers)
+
+            if kind == 'too_long' and len(text) > TWEET_MAX_LENGTH - 10:
+                text = text[:TWEET_MAX_LENGTH - 10]
+                continue
+            if kind == 'permanent' or kind == 'too_long' or attempt >= max_retries:
+                raise
+            # a 429 with reset headers already blocks the bucket until the window reopens
+            if kind == 'transient' or 'x-rate-limit-reset' not in getattr(response, 'headers', {}):
+                sleep(backoff * 2**attempt)
+            attempt += 1
+            continue
+
+        bucket.update(getattr(response, 'headers', {}))
+        return response
+
+
+
+def split_tweet(tweet):
+    """This function returns (text, media_file) for a tweet given as plain text or [text, media_file]."""
+
+    if isinstance(tweet, (list, tuple)):
+        return tuple(tweet)
+    return tweet, None
+
+
+
+def start_uploads(pool, upload, posts):
+    return [pool.submit(upload, media) if media is not None else None for text, media in posts]
+
+
+
+def post_with_media(client, text, media, bucket, reply_to=None, max_retries=3, backoff=2.0, sleep=time.sleep):
+    """This function posts one tweet once its media upload (a future, or None) is done.
+
+    Returns the response, or the exception if it could not be posted.
+    """
+
+    try:
+        kwargs = {}
+        if media is not None:
+            kwargs['media_ids'] = [media.result()]
+        if reply_to is not None:
+            kwargs['in_reply_to_tweet_id'] = reply_to
+        return post_tweet(client, text, bucket, max_retries, backoff, sleep, **kwargs)
+    except Exception as error:
+        return error
+
+
+
+def post_all(client, posts, uploads, bucket, reply_to=None, done=None, workers=4,
+             max_retries=3, backoff=2.0, sleep=time.sleep):
+    results = [None] * len(posts)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(post_with_media, client, text, uploads[i], bucket, reply_to,
+                               max_retries, backoff, sleep): i for i, (text, media) in enumerate(posts)}
+        for future in as_completed(futures):
+            i = futures[future]
+            results[i] = future.result()
+            if done is not None:
+                done(i, results[i])
+
+    return results
+
+
+
+def publish_tweets(client, tweets, upload=None, workers=4, bucket=None, reply_to=None, done=None,
+                   max_retries=3, backoff=2.0, sleep=time.sleep):
+    """This function posts a list of tweets concurrently, no faster than the rate limit allows.
+
+    tweets holds either plain text or [text, media_file] pairs (media_file may be None); upload turns a media
+    file into a media id and is only needed when there is media. Every upload starts right away.
+    Posts are started in list order (each one waits for its token and its upload first), and up to workers
+    are in flight at once. reply_to posts every tweet as a reply to that tweet id.
+    done(i, result) is called from the calling thread as each post finishes, e.g. to record it straight away.
+    Returns one entry per tweet, in order: the response, or the exception if it could not be posted.
+    """
+
+    if bucket is None:
+        bucket = TokenBucket(sleep=sleep)
+
+    posts = [split_tweet(tweet) for tweet in tweets]
+
+    with ThreadPoolExecutor(max_workers=workers) as upload_pool:
+        uploads = start_uploads(upload_pool, upload, posts)
+        return post_all(client, posts, uploads, bucket, reply_to, done, workers, max_retries, backoff, sleep)
+
+
+
+def tweet_id(response):
+    """This function pulls the new tweet's id out of a create_tweet response (requests.Response or tweepy.Response)."""
+
+    if hasattr(response, 'json'):
+        return response.json()['data']['id']
+    return response.data['id']
+
+
+
+def upload_media(api, folder):
+    """This function returns an upload function for publish_thread that sends files in folder through a tweepy.API (v1.1)."""
+
+    def upload(file_name):
+        return api.media_upload(os.path.join(folder, file_name)).media_id_string
+    return upload
+
+
+
+def publish_thread(client, tweets, upload=None, workers=4, bucket=None, chain=False, reply_to=None, done=None,
+                   max_retries=3, backoff=2.0, sleep=time.sleep):
+    """This function posts the first tweet and the rest as replies to it, uploading any media in parallel first.
+
+    tweets and upload are as in publish_tweets. Every upload starts right away, and each post only waits on
+    its own upload, so a set with media takes about as long as the slowest upload. Replies go to the first
+    tweet concurrently; chain=True instead replies to the previous tweet, one after another, for a strictly
+    ordered thread (if a reply fails, the next one replies to the last one that went out).
+    reply_to continues a thread that is already out (e.g. from an earlier run): every tweet is a reply, to
+    reply_to or, with chain=True, to the tweet before it.
+    If the first tweet of a new thread can't be posted, the rest aren't posted either (their entries are None).
+    done(i, result) is called from the calling thread as each post finishes.
+    Returns one entry per tweet, in order: the response, the exception if it could not be posted, or None.
+    """
+
+    if bucket is None:
+        bucket = TokenBucket(sleep=sleep)
+
+    posts = [split_tweet(tweet) for tweet in tweets]
+    results = [None] * len(posts)
+
+    with ThreadPoolExecutor(max_workers=workers) as upload_pool:
+        uploads = start_uploads(upload_pool, upload, posts)
+
+        def post(i, reply_to):
+            results[i] = post_with_media(client, posts[i][0], uploads[i], bucket, reply_to, max_retries, backoff, sleep)
+            if done is not None:
+                done(i, results[i])
+            return results[i]
+
+        first = 0
+        if reply_to is None and posts:
+            # a thread starts with its first tweet, so without it the rest stay unposted
+            if isinstance(post(0, None), Exception):
+                return results
+            reply_to = tweet_id(results[0])
+            first = 1
+
+        if chain:
+            for i in range(first, len(posts)):
+                if not isinstance(post(i, reply_to), Exception):
+                    reply_to = tweet_id(results[i])
+            return results
+
+        # uploads have their own pool, so replies don't queue behind them
+        def reply_done(i, result):
+            results[first + i] = result
+            if done is not None:
+                done(first + i, result)
+
+        post_all(client, posts[first:], uploads[first:], bucket, reply_to, reply_done, workers, max_retries, backoff, sleep)
+        return results
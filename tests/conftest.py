@@ -0,0 +1,8 @@
+import os
+import sys
+
+
+# the scripts import each other as top-level modules from their own folders
+here = os.path.dirname(os.path.abspath(__file__))
+for folder in ['daily', 'yearly', 'benchmarks']:
+    sys.path.insert(0, os.path.join(here, '..', folder))
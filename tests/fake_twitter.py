@@ -0,0 +1,70 @@
+# Local stand-in for tweepy.Client, so posting order and throttling can be checked offline
+
+import time
+import threading
+from tweet_publisher import TWEET_MAX_LENGTH
+
+
+class FakeResponse:
+
+    def __init__(self, tweet_id, headers=None, status_code=201):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.tweet_id = tweet_id
+
+    def json(self):
+        return {'data': {'id': str(self.tweet_id)}}
+
+
+
+class FakeHTTPError(Exception):
+
+    def __init__(self, message, status_code, headers=None):
+        super().__init__(message)
+        self.response = FakeResponse(None, headers, status_code)
+
+
+
+class FakeClient:
+    """Records create_tweet calls instead of posting them, so ordering and throttling can be checked offline.
+
+    limit/window mimic the API's rate-limit headers, and failures maps a call number to an error to raise.
+    It also stands in for tweepy.API's media_upload, taking upload_delay seconds (real time) per file.
+    """
+
+    def __init__(self, limit=200, window=900, clock=time.time, failures=None, upload_delay=0):
+        self.limit = limit
+        self.window = window
+        self.clock = clock
+        self.failures = failures or {}
+        self.upload_delay = upload_delay
+        self.calls = []
+        self.uploads = []
+        self.lock = threading.Lock()
+
+    def create_tweet(self, text=None, **kwargs):
+        with self.lock:
+            call = len(self.calls)
+            self.calls.append({'text': text, 'time': self.clock(), **kwargs})
+            now = self.clock()
+            recent = [c for c in self.calls if c['time'] > now - self.window]
+            headers = {'x-rate-limit-remaining': str(max(self.limit - len(recent), 0)),
+                       'x-rate-limit-reset': str(int(now + self.window))}
+
+        if call in self.failures:
+            status_code, message = self.failures[call]
+            raise FakeHTTPError(message, status_code, headers)
+        if text is not None and len(text) > TWEET_MAX_LENGTH:
+            raise FakeHTTPError("Your Tweet text is too long.", 400, headers)
+
+        return FakeResponse(call + 1, headers)
+
+    def media_upload(self, filename):
+        time.sleep(self.upload_delay)
+        with self.lock:
+            self.uploads.append(filename)
+            media_id = str(len(self.uploads))
+
+        class Media:
+            media_id_string = media_id
+        return Media
@@ -0,0 +1,47 @@
+import os
+import pytest
+from synthetic_statcast import generate_pitches, player_register
+from daily_functions import DAILY_CATEGORIES
+from backfill import backfill, fixture_source, load_checkpoint
+from pitch_store import partition_path, read_days
+
+
+def offline(day):
+    raise AssertionError(f"{day} is checkpointed and shouldn't be fetched again")
+
+
+
+@pytest.fixture
+def fixtures(tmp_path):
+    # three days of games, then a day off (no fixture file) on 2022-04-10
+    folder = tmp_path / 'fixtures'
+    folder.mkdir()
+    raw = generate_pitches(days=3, raw=True)
+    for day, df in raw.groupby('game_date'):
+        df.to_parquet(folder / f"{day:%Y-%m-%d}.parquet", index=False)
+    return str(folder), raw
+
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_backfill_from_fixtures(tmp_path, fixtures, workers):
+    folder, raw = fixtures
+    paths = {'checkpoint': str(tmp_path / 'days.json'), 'root': str(tmp_path / 'store'),
+             'leaderboard_root': str(tmp_path / 'leaderboards')}
+
+    pitches = backfill('2022-04-07', '2022-04-10', fixture_source(folder), workers,
+                       player_data=player_register(), **paths)
+
+    assert pitches['2022-04-10'] == 0
+    assert sum(pitches.values()) == len(raw)
+    assert len(read_days(root=paths['root'])) == len(raw)
+    assert load_checkpoint(paths['checkpoint']) == set(pitches)
+
+    for day in ['2022-04-07', '2022-04-08', '2022-04-09']:
+        assert os.path.exists(partition_path(day, paths['root']))
+        for category in DAILY_CATEGORIES:
+            assert os.path.exists(os.path.join(paths['leaderboard_root'], '2022', day, f"{category['name']}.parquet"))
+    assert not os.path.exists(partition_path('2022-04-10', paths['root']))
+
+    # every day is checkpointed, so a rerun fetches nothing
+    assert backfill('2022-04-07', '2022-04-10', offline, workers, player_data=player_register(), **paths) == {}
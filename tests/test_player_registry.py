@@ -0,0 +1,92 @@
+import os
+import time
+import pandas as pd
+import pytest
+import requests
+from synthetic_statcast import player_register
+from player_registry import load_player_data, fetch_missing_players, REGISTER_COLUMNS
+
+
+@pytest.fixture
+def register_file(tmp_path):
+    # a full-width register, old players included, standing in for the Chadwick download
+    register = player_register().assign(key_person='x', mlb_played_first=2015)
+    old = pd.DataFrame({'key_mlbam': [100001], 'name_first': ['Old'], 'name_last': ['Timer'],
+                        'mlb_played_last': [1985], 'key_person': ['y'], 'mlb_played_first': [1970]})
+    path = str(tmp_path / 'register.csv')
+    pd.concat([register, old]).to_csv(path, index=False)
+    return path
+
+
+
+def unreachable(*args):
+    raise requests.ConnectionError("no network")
+
+
+
+def make_stale(path):
+    old = time.time() - 30 * 86400
+    os.utime(path, (old, old))
+
+
+
+def test_local_file_source_is_trimmed_and_cached(tmp_path, register_file):
+    cache_file = str(tmp_path / 'cache' / 'register.parquet')
+
+    player_data = load_player_data(cache_file, source=register_file)
+
+    assert list(player_data.columns) == REGISTER_COLUMNS
+    assert len(player_data) == len(player_register())
+    assert 100001 not in set(player_data['key_mlbam'])
+
+    # a fresh cache is read without touching the source
+    cached = load_player_data(cache_file, source=unreachable)
+    pd.testing.assert_frame_equal(cached, player_data)
+
+
+
+def test_stale_cache_is_refreshed(tmp_path, register_file):
+    cache_file = str(tmp_path / 'register.parquet')
+    load_player_data(cache_file, source=register_file).iloc[:10].to_parquet(cache_file, index=False)
+    make_stale(cache_file)
+
+    assert len(load_player_data(cache_file, source=register_file)) == len(player_register())
+
+
+
+def test_stale_cache_is_used_when_the_refresh_fails(tmp_path, register_file):
+    cache_file = str(tmp_path / 'register.parquet')
+    player_data = load_player_data(cache_file, source=register_file)
+    make_stale(cache_file)
+
+    pd.testing.assert_frame_equal(load_player_data(cache_file, source=unreachable), player_data)
+
+    with pytest.raises(requests.ConnectionError):
+        load_player_data(str(tmp_path / 'missing.parquet'), source=unreachable)
+
+
+
+def test_only_missing_players_are_looked_up(tmp_path, register_file):
+    cache_file = str(tmp_path / 'register.parquet')
+    full = load_player_data(cache_file, source=register_file)
+    player_data = full.iloc[:-5]
+    asked = []
+
+    def lookup(mlb_IDs):
+        asked.extend(mlb_IDs)
+        return full[full['key_mlbam'].isin(mlb_IDs)]
+
+    player_data = fetch_missing_players(full['key_mlbam'], player_data, cache_file, lookup)
+
+    assert asked == sorted(full['key_mlbam'].iloc[-5:])
+    assert len(player_data) == len(full)
+
+
+
+def test_failed_lookup_keeps_the_register(tmp_path, register_file):
+    cache_file = str(tmp_path / 'register.parquet')
+    full = load_player_data(cache_file, source=register_file)
+
+    player_data = fetch_missing_players([1, 2, 3], full, cache_file, lookup=unreachable)
+
+    assert player_data is full
@@ -0,0 +1,50 @@
+import os
+import pandas as pd
+from synthetic_statcast import generate_pitches
+from statcast_fetch import cache_path, fetch_day, fetch_range, seed_cache
+
+
+def offline(day):
+    raise AssertionError(f"{day} should have come from the cache")
+
+
+
+def write_fixtures(folder, days=3):
+    raw = generate_pitches(days=days, raw=True)
+    for day, df in raw.groupby('game_date'):
+        df.to_parquet(os.path.join(folder, f"{day:%Y-%m-%d}.parquet"), index=False)
+    return raw
+
+
+
+def test_seeded_cache_skips_the_source(tmp_path):
+    fixtures, root = tmp_path / 'fixtures', str(tmp_path / 'cache')
+    fixtures.mkdir()
+    raw = write_fixtures(str(fixtures))
+
+    assert seed_cache(str(fixtures), root) == ['2022-04-07', '2022-04-08', '2022-04-09']
+    assert os.path.exists(cache_path('2022-04-08', root))
+
+    day = fetch_day('2022-04-08', source=offline, root=root)
+    assert len(day) == (raw['game_date'] == '2022-04-08').sum()
+
+    days = fetch_range('2022-04-07', '2022-04-09', source=offline, root=root)
+    assert len(days) == len(raw)
+
+
+
+def test_misses_are_fetched_once_and_empty_days_are_not_cached(tmp_path):
+    root = str(tmp_path)
+    raw = generate_pitches(days=1, raw=True)
+    calls = []
+
+    def source(day):
+        calls.append(day)
+        return raw if day == '2022-04-07' else pd.DataFrame()
+
+    fetch_range('2022-04-06', '2022-04-07', source=source, root=root)
+    fetch_range('2022-04-06', '2022-04-07', source=source, root=root)
+
+    # the empty day (not published yet) is asked for again; the full one is cached
+    assert sorted(calls) == ['2022-04-06', '2022-04-06', '2022-04-07']
+    assert not os.path.exists(cache_path('2022-04-06', root))
@@ -0,0 +1,106 @@
+import pytest
+from fake_twitter import FakeClient, FakeHTTPError
+from tweet_publisher import TokenBucket
+from tweet_outbox import open_outbox, enqueue_tweets, claim_pending, release, drain_outbox
+
+
+class FailingClient(FakeClient):
+    """Fails every post of the given texts with the given status."""
+
+    def __init__(self, texts, status_code=503, **kwargs):
+        super().__init__(**kwargs)
+        self.failing = set(texts)
+        self.status_code = status_code
+
+    def create_tweet(self, text=None, **kwargs):
+        if text in self.failing:
+            with self.lock:
+                self.calls.append({'text': text, 'time': self.clock(), 'failed': True, **kwargs})
+            raise FakeHTTPError("Service Unavailable", self.status_code)
+        return super().create_tweet(text, **kwargs)
+
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    path = str(tmp_path / 'outbox.sqlite')
+    enqueue_tweets('daily/2022-10-05', [(f"2022-10-05/category_{i}", f"tweet {i}") for i in range(5)], path)
+    return path
+
+
+
+def drain(client, path, **kwargs):
+    # no real waiting: a fast bucket and a sleep that returns straight away
+    return drain_outbox(client, path, bucket=TokenBucket(rate=1000, capacity=100), sleep=lambda seconds: None, **kwargs)
+
+
+
+def rows(path):
+    conn = open_outbox(path)
+    found = conn.execute("SELECT key, sent IS NOT NULL, tweet_id, attempts, claim FROM outbox ORDER BY id").fetchall()
+    conn.close()
+    return found
+
+
+
+def posted(client):
+    return [call['text'] for call in client.calls if not call.get('failed')]
+
+
+
+def test_enqueueing_a_key_again_adds_nothing(outbox):
+    assert enqueue_tweets('daily/2022-10-05', [("2022-10-05/category_1", "tweet 1, again")], outbox) == 0
+    assert enqueue_tweets('daily/2022-10-05', [("2022-10-05/category_5", "tweet 5")], outbox) == 1
+    assert len(rows(outbox)) == 6
+
+
+
+def test_failure_stays_queued_and_only_it_is_sent_next_run(outbox):
+    client = FailingClient(["tweet 2"])
+
+    assert drain(client, outbox, workers=1) == (4, 1)
+    assert posted(client) == ["tweet 0", "tweet 1", "tweet 3", "tweet 4"]
+    assert [call['text'] for call in client.calls].count("tweet 2") == 4
+    unsent = [row for row in rows(outbox) if not row[1]]
+    # retried with backoff before giving up, then handed back for the next run
+    assert [(key, attempts, claim) for key, sent, tweet_id, attempts, claim in unsent] == [("2022-10-05/category_2", 1, None)]
+
+    client = FakeClient()
+    assert drain(client, outbox) == (1, 0)
+    assert posted(client) == ["tweet 2"]
+    assert drain(client, outbox) == (0, 0)
+
+
+
+def test_claimed_tweets_are_not_posted_by_a_second_drain(outbox):
+    conn = open_outbox(outbox)
+    token, claimed = claim_pending(conn)
+    assert len(claimed) == 5
+
+    client = FakeClient()
+    assert drain(client, outbox) == (0, 0)
+    assert client.calls == []
+
+    release(conn, token)
+    conn.close()
+    assert drain(client, outbox) == (5, 0)
+    assert sorted(posted(client)) == [f"tweet {i}" for i in range(5)]
+
+
+
+@pytest.mark.parametrize('chain', [False, True])
+def test_thread_resumes_from_the_stored_tweets(outbox, chain):
+    first = FailingClient(["tweet 3", "tweet 4"], status_code=403)
+    drain(first, outbox, thread=True, chain=chain, workers=1)
+    stored = {key[-1]: tweet_id for key, sent, tweet_id, attempts, claim in rows(outbox) if sent}
+    assert sorted(stored) == ['0', '1', '2']
+
+    client = FakeClient()
+    assert drain(client, outbox, thread=True, chain=chain, workers=1) == (2, 0)
+
+    replies = {call['text']: call['in_reply_to_tweet_id'] for call in client.calls}
+    if chain:
+        # the last tweet that went out before, then the one just posted (this client's first, id 1)
+        assert replies == {"tweet 3": stored['2'], "tweet 4": '1'}
+    else:
+        assert replies == {"tweet 3": stored['0'], "tweet 4": stored['0']}
@@ -0,0 +1,122 @@
+import requests
+from fake_twitter import FakeClient
+from tweet_publisher import TokenBucket, error_kind, post_tweet, publish_tweets, publish_thread, TWEET_MAX_LENGTH
+
+
+class FakeClock:
+    """Time that only moves when something sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+
+def test_posts_start_in_list_order():
+    client = FakeClient()
+    tweets = [f"tweet {i}" for i in range(10)]
+
+    results = publish_tweets(client, tweets, workers=1, bucket=TokenBucket(rate=1000, capacity=100))
+
+    assert [call['text'] for call in client.calls] == tweets
+    assert [result.json()['data']['id'] for result in results] == [str(i + 1) for i in range(10)]
+
+
+
+def test_bucket_throttles_to_the_rate():
+    clock = FakeClock()
+    client = FakeClient(clock=clock)
+    bucket = TokenBucket(rate=1, capacity=2, clock=clock, sleep=clock.sleep)
+
+    publish_tweets(client, [f"tweet {i}" for i in range(5)], workers=1, bucket=bucket, sleep=clock.sleep)
+
+    # the burst goes out at once, then one post a second
+    assert [call['time'] for call in client.calls] == [0, 0, 1, 2, 3]
+
+
+
+def test_rate_limit_headers_block_until_reset():
+    clock = FakeClock()
+    client = FakeClient(limit=3, window=900, clock=clock)
+    bucket = TokenBucket(rate=100, capacity=100, clock=clock, sleep=clock.sleep)
+
+    publish_tweets(client, [f"tweet {i}" for i in range(4)], workers=1, bucket=bucket, sleep=clock.sleep)
+
+    assert [call['time'] for call in client.calls][:3] == [0, 0, 0]
+    assert client.calls[3]['time'] >= 900
+
+
+
+def test_rate_limited_and_server_errors_are_retried():
+    clock = FakeClock()
+    client = FakeClient(clock=clock, failures={0: (429, "Too Many Requests"), 1: (503, "Service Unavailable")})
+    bucket = TokenBucket(clock=clock, sleep=clock.sleep)
+
+    response = post_tweet(client, "tweet", bucket, sleep=clock.sleep)
+
+    assert len(client.calls) == 3
+    assert response.json()['data']['id'] == '3'
+
+
+
+def test_too_long_is_cut_once_not_retried():
+    client = FakeClient()
+
+    post_tweet(client, "x" * 300, TokenBucket())
+
+    assert [len(call['text']) for call in client.calls] == [300, TWEET_MAX_LENGTH - 10]
+
+
+
+def test_permanent_errors_are_not_retried():
+    client = FakeClient(failures={0: (403, "duplicate content")})
+
+    results = publish_tweets(client, ["tweet"], workers=1)
+
+    assert len(client.calls) == 1
+    assert isinstance(results[0], Exception)
+
+
+
+def test_only_server_and_connection_errors_are_transient():
+    assert error_kind(requests.ConnectionError()) == 'transient'
+    assert error_kind(requests.Timeout()) == 'transient'
+    assert error_kind(TypeError("a bug")) == 'permanent'
+    assert error_kind(KeyError('id')) == 'permanent'
+
+
+
+def test_thread_replies_to_the_first_tweet():
+    client = FakeClient()
+
+    publish_thread(client, ["first", "second", "third"])
+
+    replies = sorted((call['text'], call.get('in_reply_to_tweet_id')) for call in client.calls)
+    assert replies == [('first', None), ('second', '1'), ('third', '1')]
+
+
+
+def test_chained_thread_replies_in_order():
+    client = FakeClient(upload_delay=0.01)
+    tweets = [["first", "a.png"], "second", ["third", "c.png"], "fourth"]
+
+    publish_thread(client, tweets, upload=lambda file: client.media_upload(file).media_id_string, chain=True)
+
+    assert [call['text'] for call in client.calls] == ["first", "second", "third", "fourth"]
+    assert [call.get('in_reply_to_tweet_id') for call in client.calls] == [None, '1', '2', '3']
+    assert sorted(client.uploads) == ["a.png", "c.png"]
+
+
+
+def test_thread_without_its_first_tweet_is_not_posted():
+    client = FakeClient(failures={0: (403, "forbidden")})
+
+    results = publish_thread(client, ["first", "second", "third"])
+
+    assert len(client.calls) == 1
+    assert results[1:] == [None, None]
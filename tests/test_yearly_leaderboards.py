@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+from synthetic_statcast import generate_pitches
+from yearly_functions import apply_schema
+from yearly_leaderboards import CATEGORIES, update_leaderboards, leaderboard, stream_leaderboards
+from pitch_store import write_day
+
+
+@pytest.fixture(scope='module')
+def season():
+    return apply_schema(generate_pitches(days=5, seed=3))
+
+
+
+@pytest.fixture(scope='module')
+def daily_state(season):
+    state = None
+    for day, df in season.groupby('game_date', sort=True):
+        state = update_leaderboards(apply_schema(df), state, k=10)
+    return state
+
+
+
+def full_leaders(df, name, n):
+    spec = CATEGORIES[name]
+    if spec['kind'] == 'counts':
+        counts = spec['function'](df, n=None, **spec['kwargs'])
+        return counts.sort_values(by='description', ascending=False, kind='stable').iloc[:n]
+    return spec['function'](df, n=n, **spec['kwargs'])
+
+
+
+def assert_same_leaders(want, got):
+    # categories differ between a day's frame and the whole season, so values are compared rather than dtypes
+    pd.testing.assert_frame_equal(want.reset_index(drop=True), got.reset_index(drop=True),
+                                  check_dtype=False, check_categorical=False)
+
+
+
+@pytest.mark.parametrize('name', list(CATEGORIES))
+def test_daily_updates_match_full_season(season, daily_state, name):
+    assert_same_leaders(full_leaders(season, name, 10), leaderboard(daily_state, name, 10))
+
+
+
+def test_stream_matches_full_data(season, tmp_path):
+    for day, df in season.groupby('game_date', sort=True):
+        write_day(df, day, str(tmp_path))
+
+    # small chunks, so the state is merged several times
+    state = stream_leaderboards(str(tmp_path), k=10, chunk_rows=5000)
+
+    for name in CATEGORIES:
+        assert_same_leaders(full_leaders(season, name, 10), leaderboard(state, name, 10))
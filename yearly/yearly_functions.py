@@ -1,52 +1,62 @@
 import pandas as pd
 import os
+import sys
 
-
-def add_batter_team(row):
-    if row.inning_topbot == 'Top':
-        return row.away_team
-    else:
-        return row.home_team
-    
-def add_pitcher_team(row):
-    if row.inning_topbot == 'Top':
-        return row.home_team
-    else:
-        return row.away_team
-
-def fix_names(name_comma):
-    parts = name_comma.split(',')
-    return parts[-1][1:] + ' ' + parts[0]
+# the enrichment steps and the stored days are shared with the daily scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'daily'))
+from enrichment import add_teams, format_names, drop_duplicate_pitches, PITCH_KEYS
+from pitch_store import STORE_ROOT, stored_days, read_days
+# as are the pitch frame's schema and the helpers the leaderboards are built on
+from daily_functions import apply_schema, top_n, plate_appearances
 
 
-def load_data(file):
-    """This function creates the DataFrame for a specified file"""
+def load_data(file, report=False):
+    """This function creates the DataFrame for a specified file
+    
+    Pitcher names come from the matching pitcher file, joined on PITCH_KEYS. Pitches with no match
+    keep their row with the pitcher shown as "Unknown".
+    report prints how many pitches matched and the memory before and after apply_schema.
+    """
     
     df = pd.read_csv(file)
     df = df.rename(columns={'player_name':'batter_name'})
     file_pitcher = os.path.join('data', 'pitcher_data', (file[5:-4] + '_pitcher.csv'))
-    pi = pd.read_csv(file_pitcher)
-
-    df['batter_team'] = df.apply (lambda row: add_batter_team(row), axis=1)
-    pi['pitcher_team'] = pi.apply (lambda row: add_pitcher_team(row), axis=1)
-    # pi = pi[['player_name', 'pitcher_team']].rename(columns={'player_name':'pitcher_name'})
+    # only the key and the name are needed from the second file
+    pi = pd.read_csv(file_pitcher, usecols=PITCH_KEYS + ['player_name'])
+    pi = pi.rename(columns={'player_name':'pitcher_name'}).drop_duplicates(subset=PITCH_KEYS)
 
-    # df = df.merge(pi, left_index=True, right_index=True)
+    df = add_teams(df)
 
-    pi = pi.rename(columns={'player_name':'pitcher_name'})
-    df = df.merge(pi[['pitcher_name', 'pitcher_team', 'release_speed', 'release_pos_x', 'release_pos_y', 'batter', 'pitcher', 'events', 'description']],
-               on=['release_speed', 'release_pos_x', 'release_pos_y', 'batter', 'pitcher', 'events', 'description'])
+    df = df.merge(pi, on=PITCH_KEYS, how='left', validate='many_to_one')
+    matched = df['pitcher_name'].notna()
+    if report:
+        print(f"pitcher names: {matched.sum()} pitches matched, {(~matched).sum()} unmatched")
 
-    df['batter_name'] = df['batter_name'].apply(fix_names)
-    df['pitcher_name'] = df['pitcher_name'].apply(fix_names)
+    df['batter_name'] = format_names(df['batter_name'])
+    df['pitcher_name'] = format_names(df['pitcher_name']).fillna("Unknown")
          
-    df = df[df.duplicated(subset=['pitcher_name', 'release_speed', 'release_pos_x', 'release_pos_y',
-                                  'description', 'release_spin_rate']) == False]
+    df = apply_schema(df, report)
+    df = drop_duplicate_pitches(df)[0]
 
     return df
 
 
 
+def load_stored_data(season, root=STORE_ROOT, columns=None, start=None, end=None):
+    """This function creates the DataFrame for a season from the stored daily parquet partitions.
+    
+    The stored days are already cleaned, so no name fixing or pitcher merge is needed.
+    columns limits which columns are read off disk.
+    start and end (YYYY-MM-DD) limit which days are read.
+    """
+    
+    start = max(start or '', f"{season}-01-01")
+    end = min(end or '9999', f"{season}-12-31")
+    
+    return read_days(start, end, columns, root)
+
+
+
 def launch_speed(df, n=5, bottom=False, all_data=False, only_events=False, date=False):
     """This function returns the extreme exit velocities of the day.
     
@@ -56,10 +66,15 @@ def launch_speed(df, n=5, bottom=False, all_data=False, only_events=False, date=
     only_events can be used to filter by pitches ending in an event.
     """
     
-    launch = df.dropna(subset=['launch_speed']).sort_values(by='launch_speed', ascending=bottom)
+    launch = df.dropna(subset=['launch_speed'])
     
     if only_events:
         launch = launch[launch.events.notnull()]
+    
+    if all_data:
+        launch = launch.sort_values(by='launch_speed', ascending=bottom, kind="stable")
+    else:
+        launch = top_n(launch, 'launch_speed', n, ascending=bottom)
         
     if date:
         launch = launch[['batter_name', 'batter_team', 'launch_speed', 'launch_angle', 'events',
@@ -67,12 +82,8 @@ def launch_speed(df, n=5, bottom=False, all_data=False, only_events=False, date=
     else:
         launch = launch[['batter_name', 'batter_team', 'launch_speed', 'launch_angle', 'events',
                      'description', 'pitch_type', 'pitcher_name', 'pitcher_team']]
-        
-    if all_data:
-        return launch
-    else:
-        launch = launch.iloc[:n]
-        return launch
+    
+    return launch
 
     
 
@@ -86,10 +97,15 @@ def pitch_speed(df, n=5, bottom=False, all_data=False, only_events=False, unique
     unique returns only 1 result per pitcher (unless their extreme pitch appeared more than once).
     """
     
-    pitch = df.dropna(subset=['release_speed']).sort_values(by='release_speed', ascending=bottom)
+    pitch = df.dropna(subset=['release_speed'])
     
     if only_events:
         pitch = pitch[pitch.events.notnull()]
+    
+    if all_data or unique:
+        pitch = pitch.sort_values(by='release_speed', ascending=bottom, kind="stable")
+    else:
+        pitch = top_n(pitch, 'release_speed', n, ascending=bottom)
         
     if date:
         pitch = pitch[['pitcher_name', 'pitcher_team', 'release_speed', 'launch_angle', 'events',
@@ -100,9 +116,9 @@ def pitch_speed(df, n=5, bottom=False, all_data=False, only_events=False, unique
     
     if unique:
         if bottom:
-            pitch = pitch[pitch.groupby(['pitcher_name'])['release_speed'].transform(min) == pitch['release_speed']]
+            pitch = pitch[pitch.groupby(['pitcher_name'], observed=True)['release_speed'].transform(min) == pitch['release_speed']]
         else:
-            pitch = pitch[pitch.groupby(['pitcher_name'])['release_speed'].transform(max) == pitch['release_speed']]
+            pitch = pitch[pitch.groupby(['pitcher_name'], observed=True)['release_speed'].transform(max) == pitch['release_speed']]
     
     if all_data:
         return pitch
@@ -120,10 +136,15 @@ def homer_distance(df, n=5, bottom=False, all_data=False, date=False, exclude_in
     all_data returns every result, but sorted.
     """
     
-    homers = df[df.events == 'home_run'].sort_values(by='hit_distance_sc', ascending=bottom)
+    homers = df[df.events == 'home_run']
 
     if exclude_inside:
         homers = homers[~homers.des.str.contains('inside')]
+    
+    if all_data:
+        homers = homers.sort_values(by='hit_distance_sc', ascending=bottom, kind="stable")
+    else:
+        homers = top_n(homers, 'hit_distance_sc', n, ascending=bottom)
 	
     if date:
         homers = homers[['batter_name', 'batter_team', 'hit_distance_sc', 'launch_angle',
@@ -132,8 +153,6 @@ def homer_distance(df, n=5, bottom=False, all_data=False, date=False, exclude_in
         homers = homers[['batter_name', 'batter_team', 'hit_distance_sc', 'launch_angle',
                    'pitcher_name', 'pitcher_team', 'release_speed', 'pitch_type']]
     
-    homers = homers.iloc[:n]
-    
     return homers
 
 
@@ -145,9 +164,15 @@ def win_pct(df, n=5, all_data=False, date=False):
     all_data returns every result, but sorted.
     """
     
-    win_pct = df.copy(deep=True)
+    swing = abs(df['delta_home_win_exp'])*100
+    
+    if all_data:
+        win_pct = df.iloc[swing.reset_index(drop=True).sort_values(ascending=False, kind="stable").index]
+    else:
+        win_pct = top_n(df, swing, n)
+    
+    win_pct = win_pct.copy()
     win_pct['delta_home_win_exp'] = abs(win_pct['delta_home_win_exp'])*100
-    win_pct = win_pct.sort_values(by='delta_home_win_exp', ascending=False)
 
     if date:
         win_pct = win_pct[['batter_name', 'batter_team', 'events', 'delta_home_win_exp',
@@ -156,8 +181,6 @@ def win_pct(df, n=5, all_data=False, date=False):
         win_pct = win_pct[['batter_name', 'batter_team', 'events', 'delta_home_win_exp',
                    'pitcher_name', 'pitcher_team', 'release_speed', 'pitch_type']]
     
-    win_pct = win_pct.iloc[:n]
-    
     return win_pct
 
 
@@ -186,11 +209,11 @@ def pitch_counts(df, n=5, all_data=False, strike_type=swinging, pitch_type=False
         counts = df[df.description.isin(strike_type)]
     
     if pitch_type:
-        counts = counts.groupby(by=['pitcher_name', 'pitch_type']).count()
+        counts = counts.groupby(by=['pitcher_name', 'pitch_type'], observed=True).count()
     else:
-        counts = counts.groupby(by='pitcher_name').count()
+        counts = counts.groupby(by='pitcher_name', observed=True).count()
         
-    counts = counts[['description']].sort_values(by='description', ascending=False)
+    counts = counts[['description']].sort_values(by='description', ascending=False, kind="stable")
     
     counts.reset_index(inplace=True)
     
@@ -207,28 +230,13 @@ def pitches_seen(df, n=5, atbat=False, pitch_type=False, date=False):
     """
     
     if atbat:
-        grouped = df.groupby(by=['batter_name', 'batter_team', 'inning', 'outs_when_up', 'game_pk', 'game_date'])
-        seen = grouped.count()[['pitch_type']].sort_values(by='pitch_type', ascending=False).reset_index().iloc[:n]
-        
-        event_list = []
-        for i, row in seen.iterrows():
-            df_new = df[(df.batter_name==row.batter_name)&(df.inning==row.inning)&(df.outs_when_up==row.outs_when_up)&(df.game_pk==row.game_pk)]
-            event = df_new.iloc[0].events
-
-            if pd.isnull(event):
-                event = df_new[df_new.events.notnull()].events.iloc[0]
-
-            event_list.append(event)
-            
-        seen['events'] = event_list
-        
-        return seen
+        return top_n(plate_appearances(df, date=True), 'pitch_type', n).reset_index(drop=True)
     
     if pitch_type:
-        seen = df.groupby(by=['batter_name', 'pitch_type']).count()[['description']].sort_values(by='description', ascending=False)
+        seen = df.groupby(by=['batter_name', 'pitch_type'], observed=True).count()[['description']].sort_values(by='description', ascending=False, kind="stable")
         seen.reset_index(inplace=True)
     else:
-        seen = df.groupby(by='batter_name').count()[['description']].sort_values(by='description', ascending=False)
+        seen = df.groupby(by='batter_name', observed=True).count()[['description']].sort_values(by='description', ascending=False, kind="stable")
         seen.reset_index(inplace=True)
     
     return seen.iloc[:n]
@@ -251,9 +259,9 @@ def homer_launch_angle(df, n=5, low=False, date=False):
         homers = df[df.events=='home_run'][['batter_name', 'batter_team', 'launch_angle', 'hit_distance_sc',
                                        'launch_speed', 'pitcher_name', 'pitcher_team']]
     
-    la = homers.sort_values(by='launch_angle', ascending=low)
+    la = top_n(homers, 'launch_angle', n, ascending=low)
     
-    return la.iloc[:n]
+    return la
 
 
 
@@ -269,7 +277,7 @@ def spin_rate(df, n=5, low=False, pitch_type=None, date=False):
     if pitch_type != None:
         df = df[df.pitch_type==pitch_type]
         
-    spin = df.sort_values(by='release_spin_rate', ascending=low)
+    spin = top_n(df, 'release_spin_rate', n, ascending=low)
 
     if date:
         spin = spin[['pitcher_name', 'pitcher_team', 'release_spin_rate', 'pitch_type',
@@ -281,7 +289,7 @@ def spin_rate(df, n=5, low=False, pitch_type=None, date=False):
     spin['release_spin_rate'] = spin['release_spin_rate'].astype('int32')
     spin['description'] = spin['description'].str.replace('_', ' ')
     
-    return spin.iloc[:n]
+    return spin
 
 
 
@@ -300,16 +308,16 @@ def pitch_move(df, n=5, low=False, vert=False, pitch_type=None):
         move = move[move.pitch_type==pitch_type]
     
     if vert:
-        move = move.reindex(move.pfx_z.abs().sort_values(ascending=low).index)
+        move = top_n(move, move.pfx_z.abs(), n, ascending=low)
         move = move[['pitcher_name', 'pitcher_team', 'pfx_z', 'release_spin_rate', 'pfx_x', 'pitch_type',
                  'description', 'batter_name', 'batter_team', 'game_date']]
     else:
-        move = move.reindex(move.pfx_x.abs().sort_values(ascending=low).index)
+        move = top_n(move, move.pfx_x.abs(), n, ascending=low)
         move = move[['pitcher_name', 'pitcher_team', 'pfx_x', 'release_spin_rate', 'pfx_z', 'pitch_type',
                  'description', 'batter_name', 'batter_team', 'game_date']]
         
     
-    return move.iloc[:n]
+    return move
 
 
 
@@ -327,15 +335,15 @@ def wild_pitch(df, n=5, vert=False, low=False, pitch_type=None):
         wild = wild[wild.pitch_type==pitch_type]
     
     if vert:
-        wild = wild.reindex(wild.plate_z.sort_values(ascending=low).index)
+        wild = top_n(wild, 'plate_z', n, ascending=low)
         wild = wild[['pitcher_name', 'pitcher_team', 'plate_z', 'release_speed', 'plate_x', 'pitch_type',
                  'description', 'batter_name', 'batter_team', 'game_date']]
     else:
-        wild = wild.reindex(wild.plate_x.abs().sort_values(ascending=False).index)
+        wild = top_n(wild, wild.plate_x.abs(), n)
         wild = wild[['pitcher_name', 'pitcher_team', 'plate_x', 'release_speed', 'plate_z', 'pitch_type',
                  'description', 'batter_name', 'batter_team', 'game_date']]
         
-    return wild.iloc[:n]
+    return wild
 
 
 
@@ -0,0 +1,174 @@
+import pandas as pd
+import os
+import json
+from yearly_functions import (launch_speed, pitch_speed, homer_distance, win_pct, pitch_counts, pitches_seen,
+                              homer_launch_angle, spin_rate, pitch_move, wild_pitch, apply_schema, stored_days, STORE_ROOT)
+
+
+# every season-to-date category kept up incrementally
+#   kind 'rows' keeps the raw pitches that can still make the top k
+#   kind 'groups' keeps every pitch in the top k groups (e.g. at-bats)
+#   kind 'counts' keeps running totals per group
+CATEGORIES = {
+    'homer_distance_high':  {'function': homer_distance, 'kwargs': {}, 'kind': 'rows'},
+    'homer_distance_low':   {'function': homer_distance, 'kwargs': {'bottom': True}, 'kind': 'rows'},
+    'launch_speed_high':    {'function': launch_speed, 'kwargs': {'only_events': True}, 'kind': 'rows'},
+    'launch_speed_low':     {'function': launch_speed, 'kwargs': {'bottom': True, 'only_events': True}, 'kind': 'rows'},
+    'pitch_speed_high':     {'function': pitch_speed, 'kwargs': {'unique': True}, 'kind': 'rows', 'all_data': True},
+    'pitch_speed_low':      {'function': pitch_speed, 'kwargs': {'bottom': True, 'unique': True}, 'kind': 'rows', 'all_data': True},
+    'win_pct_high':         {'function': win_pct, 'kwargs': {}, 'kind': 'rows'},
+    'homer_angle_high':     {'function': homer_launch_angle, 'kwargs': {}, 'kind': 'rows'},
+    'homer_angle_low':      {'function': homer_launch_angle, 'kwargs': {'low': True}, 'kind': 'rows'},
+    'spin_rate_high':       {'function': spin_rate, 'kwargs': {}, 'kind': 'rows'},
+    'spin_rate_low':        {'function': spin_rate, 'kwargs': {'low': True}, 'kind': 'rows'},
+    'pitch_move_horz':      {'function': pitch_move, 'kwargs': {}, 'kind': 'rows'},
+    'pitch_move_vert':      {'function': pitch_move, 'kwargs': {'vert': True}, 'kind': 'rows'},
+    'wild_pitch_horz':      {'function': wild_pitch, 'kwargs': {}, 'kind': 'rows'},
+    'wild_pitch_high':      {'function': wild_pitch, 'kwargs': {'vert': True}, 'kind': 'rows'},
+    'wild_pitch_low':       {'function': wild_pitch, 'kwargs': {'vert': True, 'low': True}, 'kind': 'rows'},
+    'atbat_long':           {'function': pitches_seen, 'kwargs': {'atbat': True}, 'kind': 'groups',
+                             'keys': ['batter_name', 'batter_team', 'inning', 'outs_when_up', 'game_pk', 'game_date']},
+    'pitches_seen':         {'function': pitches_seen, 'kwargs': {}, 'kind': 'counts'},
+    'pitches_seen_type':    {'function': pitches_seen, 'kwargs': {'pitch_type': True}, 'kind': 'counts'},
+    'swinging_strikes':     {'function': pitch_counts, 'kwargs': {}, 'kind': 'counts'},
+    'pitches_thrown':       {'function': pitch_counts, 'kwargs': {'total': True}, 'kind': 'counts'},
+}
+
+
+def merge_category(spec, state, new_df, k):
+    """This function folds one batch of new pitches into a category's saved state."""
+
+    function = spec['function']
+
+    if spec['kind'] == 'counts':
+        day = function(new_df, n=None, **spec['kwargs'])
+        keys = [col for col in day.columns if col != 'description']
+        counts = pd.concat([state, day]) if state is not None else day
+        return counts.groupby(by=keys, observed=True)['description'].sum().reset_index()
+
+    # older pitches go first so the candidates keep season order
+    candidates = pd.concat([state, new_df], ignore_index=True) if state is not None else new_df.reset_index(drop=True)
+
+    if spec['kind'] == 'groups':
+        top = function(candidates, n=k, **spec['kwargs'])[spec['keys']]
+        keep = candidates[spec['keys']].merge(top.drop_duplicates(), how='left', indicator=True)['_merge'] == 'both'
+        return candidates[keep.values]
+
+    if spec.get('all_data'):
+        top = function(candidates, all_data=True, **spec['kwargs'])
+    else:
+        top = function(candidates, n=k, **spec['kwargs'])
+
+    return candidates.loc[top.index].sort_index()
+
+
+
+def update_leaderboards(new_df, state=None, k=25, categories=CATEGORIES):
+    """This function merges new pitches (usually yesterday's) into the season-to-date state.
+
+    state is the dict returned by a previous call or load_state (None starts a new season).
+    k is how many leaders each category keeps, so leaderboards can be asked for up to k results.
+    """
+
+    state = dict(state) if state is not None else {}
+    for name, spec in categories.items():
+        state[name] = merge_category(spec, state.get(name), new_df, k)
+
+    return state
+
+
+
+def leaderboard(state, name, n=5, categories=CATEGORIES, **kwargs):
+    """This function returns the same leaders the yearly function would find on the whole season.
+
+    n controls how many results are returned (at most the k the state was built with).
+    kwargs are passed through to the yearly function (e.g. date=True).
+    """
+
+    spec = categories[name]
+
+    if spec['kind'] == 'counts':
+        counts = state[name].sort_values(by='description', ascending=False, kind='stable')
+        return counts.reset_index(drop=True).iloc[:n]
+
+    return spec['function'](state[name], n=n, **spec['kwargs'], **kwargs)
+
+
+
+def save_state(state, folder, days=()):
+    """This function saves the leaderboard state, along with the days already merged in."""
+
+    os.makedirs(folder, exist_ok=True)
+    for name, frame in state.items():
+        frame.to_parquet(os.path.join(folder, f"{name}.parquet"))
+
+    with open(os.path.join(folder, 'days.json'), 'w') as f:
+        json.dump(sorted(days), f)
+
+
+
+def load_state(folder):
+    """This function loads saved leaderboard state and the days it covers ({} and [] if none is saved)."""
+
+    if not os.path.exists(os.path.join(folder, 'days.json')):
+        return {}, []
+
+    with open(os.path.join(folder, 'days.json')) as f:
+        days = json.load(f)
+
+    state = {}
+    for file in os.listdir(folder):
+        if file.endswith('.parquet'):
+            state[file[:-len('.parquet')]] = pd.read_parquet(os.path.join(folder, file))
+
+    return state, days
+
+
+
+def update_saved_leaderboards(new_df, day, folder, k=25):
+    """This function merges one day into the saved state, skipping days that were already merged."""
+
+    state, days = load_state(folder)
+    if day in days:
+        return state
+
+    state = update_leaderboards(new_df, state or None, k=k)
+    save_state(state, folder, days + [day])
+
+    return state
+
+
+
+def stored_chunks(root=STORE_ROOT, start=None, end=None, chunk_rows=250000, columns=None):
+    """This function reads the stored days a few at a time, oldest first.
+    
+    Each chunk holds whole days (so no at-bat is split across chunks) and stops growing once it
+    reaches chunk_rows pitches, so memory stays bounded however many seasons are stored.
+    """
+    
+    frames, rows = [], 0
+    for file in stored_days(start, end, root):
+        frame = pd.read_parquet(file, columns=columns)
+        frames.append(frame)
+        rows += len(frame)
+        if rows >= chunk_rows:
+            yield apply_schema(pd.concat(frames, ignore_index=True))
+            frames, rows = [], 0
+    
+    if frames:
+        yield apply_schema(pd.concat(frames, ignore_index=True))
+
+
+
+def stream_leaderboards(root=STORE_ROOT, start=None, end=None, k=25, chunk_rows=250000, categories=CATEGORIES):
+    """This function builds leaderboard state over every stored day from start to end (e.g. 2015 to now) chunk by chunk.
+    
+    Only one chunk and the per-category leaders/counts are held at a time, and the results from
+    leaderboard(state, name, n) match the yearly functions run on all of the data at once (for n up to k).
+    """
+    
+    state = None
+    for chunk in stored_chunks(root, start, end, chunk_rows):
+        state = update_leaderboards(chunk, state, k, categories)
+    
+    return state if state is not None else {}